@@ -1,7 +1,19 @@
+from __future__ import annotations
 import article_win
-import requests
-import html2text
-import textwrap
+import codecs
+import typing
+import article_lines
+import article_extractor
+import article_cache
+import session_pool
+import helper_extras
+import latency_stats
+import time
+
+if typing.TYPE_CHECKING:
+    # Imported where they're used instead, as they're slow to import
+    import html2text
+    import requests
 
 
 class Article:
@@ -15,36 +27,213 @@ class Article:
         "Referer": REFERER,
         "Accept": ACCEPT,
     }
+    STREAM_CHUNK = 16 * 1024  # Bytes read per chunk when streaming
+    disk_cache: article_cache.ArticleCache | None = None  # Shared by all articles
+    sessions: session_pool.SessionPool | None = None  # Shared by all articles
+    streaming = True  # Whether load_article_txt streams the download
+    extractor: article_extractor.ArticleExtractor | None = None  # Shared
+    latency = latency_stats.LatencyStats()  # Shared, replaced by NewsReader's
+
+    @staticmethod
+    def get_text_maker() -> html2text.HTML2Text:
+        html2text = helper_extras.import_module("html2text")
+        text_maker = html2text.HTML2Text()
+        text_maker.ignore_links = text_maker.ignore_images = True
+        text_maker.bypass_tables = False
+        text_maker.body_width = 0  # ArticleLines wraps the text instead
+        return text_maker
 
     def __init__(self, url: str):
-        self.article_txt: list[str] = []
+        self.article_txt = article_lines.ArticleLines(article_win.ArticleWin.WIDTH_TXT)
         self.offset = 0
         self.url = url
+        self.is_html_cached = False  # True if get_html was served from disk_cache
+        self.is_loaded = False  # True once article_txt is complete
+        self.is_cancelled = False
 
-    def get_html(self):
+    def _get_response(self, stream: bool = False) -> requests.Response | None:
+        """Requests the page, revalidating the disk_cache copy if there is one,
+        so an unchanged page (304) is not downloaded again.
+        Returns None if the request fails.
+
+        Times the request as "article.request" (DNS lookup, connect and the
+        wait for the response headers, plus the download unless stream).
+        """
+        self.is_html_cached = False
+        validators = (
+            self.disk_cache and self.disk_cache.get_validators(self.url)
+        ) or {}
         try:
-            response = requests.get(self.url, headers=self.HEADERS)
-            return response.text
+            with self.latency.time("article.request"):
+                return (self.sessions or helper_extras.import_module("requests")).get(
+                    self.url, headers={**self.HEADERS, **validators}, stream=stream
+                )
         except Exception:
-            pass
+            return None
+
+    def _get_response_text(self, response: requests.Response) -> str:
+        """Returns the text of a streamed response, timing its download
+        ("article.download") and its decoding, including guessing the charset
+        if the headers don't give it ("article.charset")."""
+        with self.latency.time("article.download"):
+            response.content
+        with self.latency.time("article.charset"):
+            return response.text
+
+    def _put_cached_html(self, response: requests.Response, html: str) -> None:
+        if self.disk_cache and response.ok:
+            self.disk_cache.put_html(
+                self.url,
+                html,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+            )
+
+    def get_html(self):
+        """Returns the page html, from disk_cache if the page is unchanged
+        or the request fails."""
+        response = self._get_response(stream=True)
+        if response is None or response.status_code == 304:
+            return self._get_cached_html()
+        with response:
+            html = self._get_response_text(response)
+        self._put_cached_html(response, html)
+        return html
+
+    def _get_cached_html(self) -> str | None:
+        html = self.disk_cache and self.disk_cache.get_html(self.url)
+        self.is_html_cached = bool(html)
+        return html
+
+    def load_article_txt(self) -> None:
+        """Sets article_txt, streaming the download if streaming is on.
+        Blocks on the network, so call it off the curses thread."""
+        if self.streaming:
+            self.stream_article_txt()
+        else:
+            self.set_article_txt()
+
+    def cancel_load(self) -> None:
+        """Makes a running stream_article_txt stop at its next chunk."""
+        self.is_cancelled = True
 
     def set_article_txt(self):
-        text_maker = html2text.HTML2Text()
-        text_maker.ignore_links = text_maker.ignore_images = True
-        text_maker.bypass_tables = False
-        html = self.get_html()
+        self._set_article_txt_from_html(self.get_html())
+
+    @classmethod
+    def get_txt_variant(cls) -> str:
+        """Returns the name of the disk cache's text variant for the extractor."""
+        return (cls.extractor and cls.extractor.NAME) or ""
+
+    def _set_article_txt_from_html(self, html: str | None) -> None:
         if html:
-            text = text_maker.handle(html)
-            self.article_txt = textwrap.wrap(
-                text, width=article_win.ArticleWin.WIDTH_TXT
+            text = self.is_html_cached and self.disk_cache.get_txt(
+                self.url, self.get_txt_variant()
             )
+            if not text:
+                if self.extractor:
+                    with self.latency.time("article.extract"):
+                        html = self.extractor.extract(html)
+                with self.latency.time("article.html2text"):
+                    text = self.get_text_maker().handle(html)
+                if self.disk_cache:
+                    self.disk_cache.put_txt(self.url, text, self.get_txt_variant())
+            self.article_txt.append_txt(text, is_final=True)
+        self.is_loaded = True
+
+    def stream_article_txt(self) -> None:
+        """Downloads the page in chunks, converting each chunk and appending
+        the text to article_txt, so the start of the article can be shown
+        while the rest is still downloading.
+
+        An extractor needs the whole page, so with one set the page is
+        converted once the download is done instead.
+
+        The time spent waiting for chunks, decoding them and converting them
+        is added up and recorded once the page is done, like get_html's.
+        """
+        response = self._get_response(stream=True)
+        if response is None or response.status_code == 304:
+            self._set_article_txt_from_html(self._get_cached_html())
+            return
+        if self.extractor:
+            with response:
+                html = self._get_response_text(response)
+            self._put_cached_html(response, html)
+            self._set_article_txt_from_html(html)
+            return
+        text_maker = self.get_text_maker()
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(
+            errors="replace"
+        )
+        html_chunks: list[str] = []
+        html_tail = ""  # Html after the last complete tag, not yet fed
+        streamed_len = 0  # Length of the text appended so far
+        secs = dict.fromkeys(
+            ("article.download", "article.charset", "article.html2text"), 0.0
+        )
+        with response:
+            chunks = response.iter_content(self.STREAM_CHUNK)
+            while True:
+                start = time.perf_counter()
+                chunk = next(chunks, None)
+                secs["article.download"] += time.perf_counter() - start
+                if chunk is None:
+                    break
+                if self.is_cancelled:
+                    return
+                start = time.perf_counter()
+                html_chunks.append(decoder.decode(chunk))
+                secs["article.charset"] += time.perf_counter() - start
+                # html2text adds spaces where a text node is split between
+                # feeds, so only feed up to the end of the last complete tag.
+                html_tail += html_chunks[-1]
+                cut = html_tail.rfind(">") + 1
+                out_len = len(text_maker.outtextlist)
+                start = time.perf_counter()
+                text_maker.feed(html_tail[:cut])
+                secs["article.html2text"] += time.perf_counter() - start
+                html_tail = html_tail[cut:]
+                text = "".join(text_maker.outtextlist[out_len:]).replace(
+                    "&nbsp_place_holder;", " "
+                )
+                streamed_len += len(text)
+                self.article_txt.append_txt(text)
+        html_chunks.append(decoder.decode(b"", final=True))
+        start = time.perf_counter()
+        text_maker.feed(html_tail + html_chunks[-1])
+        text_maker.feed("")
+        text = text_maker.finish()
+        secs["article.html2text"] += time.perf_counter() - start
+        for stage, stage_secs in secs.items():
+            self.latency.record(stage, stage_secs)
+        self.article_txt.append_txt(text[streamed_len:], is_final=True)
+        self._put_cached_html(response, "".join(html_chunks))
+        if self.disk_cache:
+            self.disk_cache.put_txt(self.url, text)
+        self.is_loaded = True
 
     def get_article_len(self):
-        return len(self.article_txt)
+        """Returns the (approximate, until it's all been wrapped) line count."""
+        return self.article_txt.get_approx_len()
+
+    def set_width(self, width: int) -> None:
+        """Rewraps the article to width, from its unwrapped text, keeping the
+        paragraph at the top of the view at the top. No lines are wrapped
+        now; they're wrapped from that paragraph as they're scrolled to."""
+        para_idx = self.article_txt.get_para_of_line(self.offset)
+        if self.article_txt.set_width(width, para_idx):
+            self.offset = self.article_txt.get_line_of_para(para_idx)
 
     def incr_offset(self, incr):
-        if self.article_txt:
-            self.offset = max(self.offset + incr, 0)
+        # Wrap far enough to show the new offset, so the clamping below
+        # uses the exact length if the article ends before then.
+        self.article_txt.wrap_to(
+            self.offset + incr + len(article_win.ArticleWin.get_LINE_RANGE())
+        )
+        first_idx = self.article_txt.wrap_from(self.offset + incr)
+        if self.get_article_len():
+            self.offset = max(self.offset + incr, first_idx)
             self.offset = min(
                 (self.get_article_len() - 1)
                 - (len(article_win.ArticleWin.get_LINE_RANGE()) - 1),
@@ -57,4 +246,4 @@ class Article:
         self.offset = 0
 
     def get_offset_line(self, idx: int) -> str:
-        return self.article_txt[idx + self.offset]
+        return self.article_txt.get_line(idx + self.offset)
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import helper_extras
+
+
+class ArticleCache:
+    """Persistent on-disk cache of article pages keyed by URL.
+
+    Stores the raw HTML of each page along with its ETag/Last-Modified
+    validators and its html2text output (one per variant, i.e. per extraction
+    stage used before conversion), and evicts the least recently used
+    entries once the total size of the cached files exceeds the byte budget.
+
+    Attributes:
+        path: String of the path to the cache directory.
+        max_bytes: Byte budget of the cached files.
+        index: Dict of URL key to entry dict
+            (url, etag, last_modified, size, used, txt_variants).
+        is_dirty: Boolean of whether index has changes not yet written.
+        MAX_BYTES: Default byte budget.
+        INDEX_NAME: Filename of the index within the cache directory.
+        INDEX_WRITE_SECS: Least seconds between writes of the index for
+            cache hits, which only change when entries were last used.
+    """
+
+    MAX_BYTES = 50 * 1024 * 1024
+    INDEX_NAME = "index.json"
+    INDEX_WRITE_SECS = 30.0
+    # Files the cache writes: the key, then the txt variant if any, then the type
+    FILE_PATTERN = re.compile(r"([0-9a-f]{40})(\.[^.]+)?\.(html|txt)")
+
+    @staticmethod
+    def _get_key(url: str) -> str:
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def __init__(self, path: str, max_bytes: int = MAX_BYTES) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.index: dict[str, dict] = {}
+        self.is_dirty = False
+        self.written_at = time.monotonic()  # When index was last written
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            with open(self._get_index_filename(), encoding="utf-8") as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+        self._remove_unindexed_files()
+
+    def _get_index_filename(self) -> str:
+        return os.path.join(self.path, self.INDEX_NAME)
+
+    def _get_filename(self, key: str, ext: str) -> str:
+        return os.path.join(self.path, key + ext)
+
+    def _remove_unindexed_files(self) -> None:
+        """Removes the cached files the index doesn't list, e.g. those left
+        by an index that couldn't be read or was written before they were,
+        and any temporary files of index writes that didn't finish."""
+        try:
+            filenames = os.listdir(self.path)
+        except OSError:
+            return
+        for filename in filenames:
+            match = self.FILE_PATTERN.fullmatch(filename)
+            is_indexed = match and self._is_indexed(
+                match.group(1), (match.group(2) or "")[1:], match.group(3)
+            )
+            is_temp = filename.startswith(self.INDEX_NAME + ".")  # See write_file
+            if (match and not is_indexed) or is_temp:
+                try:
+                    os.remove(os.path.join(self.path, filename))
+                except OSError:
+                    pass
+
+    def _is_indexed(self, key: str, variant: str, ext: str) -> bool:
+        entry = self.index.get(key)
+        return bool(
+            entry and (ext == "html" or variant in (entry.get("txt_variants") or []))
+        )
+
+    def _write_index(self) -> None:
+        """Writes the index, replacing the old one whole. Called with the lock held."""
+        try:
+            helper_extras.write_file(
+                self._get_index_filename(), json.dumps(self.index).encode("utf-8")
+            )
+        except OSError:
+            return
+        self.is_dirty = False
+        self.written_at = time.monotonic()
+
+    def flush(self) -> None:
+        """Writes the index if cache hits have changed it since it was written."""
+        with self.lock:
+            if self.is_dirty:
+                self._write_index()
+
+    def _read_file(self, key: str, ext: str) -> str | None:
+        try:
+            with open(self._get_filename(key, ext), encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_file(self, key: str, ext: str, data: str) -> int:
+        try:
+            with open(self._get_filename(key, ext), "w", encoding="utf-8") as f:
+                f.write(data)
+            return os.path.getsize(self._get_filename(key, ext))
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _get_txt_ext(variant: str) -> str:
+        return ((variant and "." + variant) or "") + ".txt"
+
+    def _remove_files(self, key: str) -> None:
+        variants = (self.index.get(key) or {}).get("txt_variants") or [""]
+        for ext in [".html"] + [self._get_txt_ext(v) for v in variants]:
+            try:
+                os.remove(self._get_filename(key, ext))
+            except OSError:
+                pass
+
+    def get_total_bytes(self) -> int:
+        return sum(entry.get("size", 0) for entry in self.index.values())
+
+    def get_validators(self, url: str) -> dict:
+        """Returns the conditional request headers for url's cached page,
+        or an empty dict if the page isn't cached or has no validators.
+        """
+        entry = self.index.get(self._get_key(url)) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def get_html(self, url: str) -> str | None:
+        with self.lock:
+            key = self._get_key(url)
+            if key not in self.index:
+                return None
+            html = self._read_file(key, ".html")
+            if html is None:
+                del self.index[key]
+                self.is_dirty = True
+                return None
+            self.index[key]["used"] = time.time()
+            self.is_dirty = True
+            if time.monotonic() - self.written_at >= self.INDEX_WRITE_SECS:
+                self._write_index()
+            return html
+
+    def get_txt(self, url: str, variant: str = "") -> str | None:
+        with self.lock:
+            key = self._get_key(url)
+            return (
+                key in self.index
+                and variant in (self.index[key].get("txt_variants") or [])
+                and self._read_file(key, self._get_txt_ext(variant))
+            ) or None
+
+    def put_html(
+        self, url: str, html: str, etag: str | None, last_modified: str | None
+    ) -> None:
+        """Stores html for url, replacing any previous entry and its text."""
+        with self.lock:
+            key = self._get_key(url)
+            self._remove_files(key)
+            self.index[key] = {
+                "url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "size": self._write_file(key, ".html", html),
+                "used": time.time(),
+            }
+            self._evict()
+            self._write_index()
+
+    def put_txt(self, url: str, txt: str, variant: str = "") -> None:
+        with self.lock:
+            key = self._get_key(url)
+            entry = self.index.get(key)
+            if entry and variant not in entry.setdefault("txt_variants", []):
+                entry["size"] += self._write_file(key, self._get_txt_ext(variant), txt)
+                entry["txt_variants"].append(variant)
+                self._evict()
+                self._write_index()
+
+    def _evict(self) -> None:
+        total = self.get_total_bytes()
+        for key in sorted(self.index, key=lambda k: self.index[k].get("used", 0)):
+            if total <= self.max_bytes:
+                break
+            self._remove_files(key)
+            total -= self.index.pop(key).get("size", 0)
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+
+import argparse
+import html.parser
+import re
+import time
+
+
+class HtmlElement:
+    """An element found by HtmlBlockParser, with its offsets in the html
+    and the amount of text in it."""
+
+    def __init__(self, tag: str, attrs: dict, start: int, parent: int) -> None:
+        self.tag = tag
+        self.attrs = attrs
+        self.start = start  # Offset of the start tag
+        self.end = -1  # Offset just past the end tag
+        self.parent = parent  # Index of the parent element, or -1
+        self.text_len = 0  # Characters of text in the element
+        self.link_text_len = 0  # Characters of text in links in the element
+
+    def get_name_hint(self) -> str:
+        return (self.attrs.get("id") or "") + " " + (self.attrs.get("class") or "")
+
+
+class HtmlBlockParser(html.parser.HTMLParser):
+    """Finds the elements of a page and their offsets without building a DOM,
+    so that an extractor can cut a block out of the original html."""
+
+    VOID_TAGS = {
+        "area",
+        "base",
+        "br",
+        "col",
+        "embed",
+        "hr",
+        "img",
+        "input",
+        "link",
+        "meta",
+        "source",
+        "track",
+        "wbr",
+    }
+    SKIP_TEXT_TAGS = {"script", "style", "noscript", "template"}
+
+    def __init__(self, page: str) -> None:
+        super().__init__(convert_charrefs=True)
+        self.page = page
+        self.line_starts = [0] + [m.end() for m in re.finditer("\n", page)]
+        self.elements: list[HtmlElement] = []
+        self.stack: list[int] = []
+        self.feed(page)
+        self.close()
+        for idx in self.stack:
+            self.elements[idx].end = len(page)
+
+    def _get_offset(self) -> int:
+        line, col = self.getpos()
+        return self.line_starts[line - 1] + col
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.VOID_TAGS:
+            return
+        parent = self.stack[-1] if self.stack else -1
+        self.elements.append(HtmlElement(tag, dict(attrs), self._get_offset(), parent))
+        self.stack.append(len(self.elements) - 1)
+
+    def handle_endtag(self, tag):
+        if not any(self.elements[i].tag == tag for i in self.stack):
+            return
+        end = self.page.find(">", self._get_offset()) + 1 or len(self.page)
+        while self.stack:
+            idx = self.stack.pop()
+            self.elements[idx].end = end
+            if self.elements[idx].tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self.stack and self.elements[self.stack[-1]].tag in self.SKIP_TEXT_TAGS:
+            return
+        text_len = len(data.strip())
+        is_link = any(self.elements[i].tag == "a" for i in self.stack)
+        for idx in self.stack:
+            self.elements[idx].text_len += text_len
+            if is_link:
+                self.elements[idx].link_text_len += text_len
+
+    def get_slice(self, element: HtmlElement, drop_tags: set[str]) -> str:
+        """Returns the html of element with the elements in drop_tags cut out."""
+        drops = sorted(
+            (e.start, e.end)
+            for e in self.elements
+            if e.tag in drop_tags
+            and e.start >= element.start
+            and e.end <= element.end
+            and e is not element
+        )
+        parts = []
+        pos = element.start
+        for start, end in drops:
+            if start >= pos:
+                parts.append(self.page[pos:start])
+                pos = end
+        parts.append(self.page[pos : element.end])
+        return "".join(parts)
+
+
+class ArticleExtractor:
+    """Base extraction stage: finds the main article body in a page's html
+    before it's converted to text. This base class keeps the whole page.
+
+    Subclasses override find_body. If they can't find a body, extract
+    falls back to the whole page.
+    """
+
+    NAME = "none"
+    DROP_TAGS = {
+        "script",
+        "style",
+        "noscript",
+        "template",
+        "nav",
+        "footer",
+        "aside",
+        "form",
+        "iframe",
+        "svg",
+        "button",
+    }
+    MIN_BODY_TEXT = 250  # Characters of text a body must have to be used
+
+    def extract(self, page: str) -> str:
+        parser = HtmlBlockParser(page)
+        body = self.find_body(parser)
+        if body is None or body.text_len < self.MIN_BODY_TEXT:
+            return page
+        return parser.get_slice(body, self.DROP_TAGS)
+
+    def find_body(self, parser: HtmlBlockParser) -> HtmlElement | None:
+        return None
+
+
+class TagExtractor(ArticleExtractor):
+    """Uses the <article> (or <main>, or role="main") element with the most text."""
+
+    NAME = "tag"
+
+    def find_body(self, parser: HtmlBlockParser) -> HtmlElement | None:
+        for is_candidate in (
+            lambda e: e.tag == "article",
+            lambda e: e.tag == "main" or e.attrs.get("role") == "main",
+        ):
+            candidates = [e for e in parser.elements if is_candidate(e)]
+            if candidates:
+                return max(candidates, key=lambda e: e.text_len)
+        return None
+
+
+class DensityExtractor(ArticleExtractor):
+    """Uses the block whose paragraphs hold the most non-link text.
+
+    Each paragraph scores its text length for its parent block and half that
+    for its grandparent, like Readability; blocks whose id or class look like
+    page chrome (navigation, comments, cookie banners, etc.) don't score.
+    """
+
+    NAME = "density"
+    PARA_TAGS = {"p", "pre", "blockquote", "li"}
+    BLOCK_TAGS = {"div", "section", "article", "main", "td", "body"}
+    CHROME_HINT = re.compile(
+        r"nav|menu|footer|header|comment|cookie|consent|banner|sidebar|promo"
+        r"|related|share|social|newsletter|subscribe|advert|\bads?\b",
+        re.IGNORECASE,
+    )
+    MIN_PARA_TEXT = 25
+
+    def find_body(self, parser: HtmlBlockParser) -> HtmlElement | None:
+        scores: dict[int, float] = {}
+        for e in parser.elements:
+            para_text = e.text_len - e.link_text_len
+            if e.tag not in self.PARA_TAGS or para_text < self.MIN_PARA_TEXT:
+                continue
+            parent = self._get_block(parser, e.parent)
+            for weight in (1.0, 0.5):
+                if parent < 0:
+                    break
+                scores[parent] = scores.get(parent, 0) + para_text * weight
+                parent = self._get_block(parser, parser.elements[parent].parent)
+        scores = {
+            idx: score
+            for idx, score in scores.items()
+            if not self.CHROME_HINT.search(parser.elements[idx].get_name_hint())
+        }
+        if not scores:
+            return None
+        return parser.elements[max(scores, key=lambda idx: scores[idx])]
+
+    def _get_block(self, parser: HtmlBlockParser, idx: int) -> int:
+        """Returns the index of the nearest block element at or above idx."""
+        while idx >= 0 and parser.elements[idx].tag not in self.BLOCK_TAGS:
+            idx = parser.elements[idx].parent
+        return idx
+
+
+EXTRACTORS = {
+    extractor.NAME: extractor
+    for extractor in (ArticleExtractor, TagExtractor, DensityExtractor)
+}
+
+
+def get_extractor(name: str | None) -> ArticleExtractor | None:
+    """Returns an instance of the extractor named name,
+    or None for "none" or an empty name.
+
+    Raises:
+        ValueError: If there's no extractor named name.
+    """
+    if not name or name == ArticleExtractor.NAME:
+        return None
+    if name not in EXTRACTORS:
+        raise ValueError(
+            f"unknown extractor {name!r} (choose from {', '.join(EXTRACTORS)})"
+        )
+    return EXTRACTORS[name]()
+
+
+def report(paths: list[str], repeat: int = 3) -> list[dict]:
+    """Converts each saved page with each extractor (and with none),
+    returning the best conversion time, the peak memory and the output size.
+    """
+    import article  # Deferred so this module can be used on its own
+    import tracemalloc
+
+    rows = []
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            page = f.read()
+        for name, extractor_class in EXTRACTORS.items():
+            extractor = extractor_class()
+            times = []
+            for _ in range(repeat):
+                tracemalloc.start()
+                start = time.perf_counter()
+                text = article.Article.get_text_maker().handle(extractor.extract(page))
+                times.append(time.perf_counter() - start)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            rows.append(
+                {
+                    "page": path,
+                    "extractor": name,
+                    "html_chars": len(page),
+                    "seconds": min(times),
+                    "peak_bytes": peak,
+                    "txt_chars": len(text),
+                    "txt_lines": len([p for p in text.split("\n") if p.strip()]),
+                }
+            )
+    return rows
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="Compare conversion time and output size of saved pages "
+        "with and without each extraction stage."
+    )
+    arg_parser.add_argument("pages", nargs="+", help="Saved html pages")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+    print(
+        f"{'page':40} {'extractor':10} {'ms':>9} {'peak KiB':>9} "
+        f"{'txt chars':>10} {'txt lines':>9}"
+    )
+    for row in report(args.pages, args.repeat):
+        print(
+            f"{row['page'][-40:]:40} {row['extractor']:10} "
+            f"{row['seconds'] * 1000:9.1f} {row['peak_bytes'] / 1024:9.0f} "
+            f"{row['txt_chars']:10} {row['txt_lines']:9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
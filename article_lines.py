@@ -0,0 +1,180 @@
+import bisect
+import math
+import textwrap
+import threading
+
+
+class ArticleLines:
+    """The wrapped lines of an article's text, wrapped a paragraph at a time
+    only as far as they are read, so long articles don't pay to wrap
+    lines that are never scrolled to.
+
+    Text can be appended while the lines are being read, e.g. while the
+    article is streaming in, and the width can be changed, which drops the
+    lines to be rewrapped from the paragraphs as they're read again.
+
+    After a width change the lines are wrapped from an anchor paragraph
+    (the one at the top of the view) on, numbered from an estimate of the
+    lines before it, and the paragraphs before it are wrapped, last first,
+    only if they're scrolled back to. So the first line's index is 0 unless
+    that estimate was off, and wrap_from finds it.
+
+    Attributes:
+        width: Width to wrap the lines to.
+        paras: List of the unwrapped paragraphs.
+        para_tail: String of the appended text after the last complete paragraph.
+        lines: List of the lines wrapped so far.
+        line_base: Index of the first line in lines.
+        para_starts: List of the index of the first line of each paragraph
+            wrapped so far.
+        first_para: Index of the first paragraph in paras wrapped.
+        next_para: Index of the first paragraph in paras not yet wrapped
+            after the wrapped ones.
+        head_est: Estimated line count of the paragraphs before first_para.
+        wrapped_est: Estimated line count of the paragraphs wrapped so far.
+        total_est: Estimated line count of all paragraphs.
+    """
+
+    def __init__(self, width: int) -> None:
+        self.width = width
+        self.paras: list[str] = []
+        self.para_tail = ""
+        self.lines: list[str] = []
+        self.line_base = 0
+        self.para_starts: list[int] = []
+        self.first_para = 0
+        self.next_para = 0
+        self.head_est = 0
+        self.wrapped_est = 0
+        self.total_est = 0
+        self.lock = threading.Lock()
+
+    def append_txt(self, text: str, is_final: bool = False) -> None:
+        """Adds text to the end of the article. Unless is_final, the text after
+        the last line break is held back, since it may be an unfinished paragraph.
+        """
+        with self.lock:
+            paras = (self.para_tail + text).split("\n")
+            self.para_tail = (not is_final and paras.pop()) or ""
+            paras = [p for p in paras if p.strip()]
+            self.paras += paras
+            self.total_est += sum(self._get_para_est(p) for p in paras)
+
+    def get_txt(self) -> str:
+        """Returns the unwrapped text, one paragraph per line."""
+        with self.lock:
+            return "\n".join(self.paras + [self.para_tail]).rstrip("\n")
+
+    def wrap_to(self, line_count: int) -> None:
+        """Wraps paragraphs until the lines go up to line_count
+        or every paragraph is wrapped."""
+        with self.lock:
+            line_count -= self.line_base  # Lines needed in lines
+            while len(self.lines) < line_count and self.next_para < len(self.paras):
+                self._wrap_next_para()
+
+    def wrap_from(self, idx: int) -> int:
+        """Wraps the paragraphs before the first wrapped one, last first,
+        until the line at idx is wrapped or the first paragraph is.
+        Returns the index of the first line wrapped, so the first line's
+        if it's after idx."""
+        with self.lock:
+            self._wrap_prev_paras(idx)
+            return self.line_base
+
+    def _wrap_next_para(self) -> None:
+        para = self.paras[self.next_para]
+        self.para_starts.append(self.line_base + len(self.lines))
+        self.lines += textwrap.wrap(para, width=self.width)
+        self.wrapped_est += self._get_para_est(para)
+        self.next_para += 1
+
+    def _wrap_prev_paras(self, idx: int) -> None:
+        para_lines = []  # Lines of each paragraph wrapped, last first
+        line_count = 0
+        while self.line_base - line_count > idx and self.first_para > 0:
+            self.first_para -= 1
+            para = self.paras[self.first_para]
+            para_lines.append(textwrap.wrap(para, width=self.width))
+            line_count += len(para_lines[-1])
+            self.head_est -= self._get_para_est(para)
+            self.wrapped_est += self._get_para_est(para)
+        self.line_base -= line_count
+        lines, para_starts = [], []
+        for para_lines_i in reversed(para_lines):
+            para_starts.append(self.line_base + len(lines))
+            lines += para_lines_i
+        self.lines[:0] = lines
+        self.para_starts[:0] = para_starts
+
+    def set_width(self, width: int, anchor_para: int = 0) -> bool:
+        """Changes the width to wrap to, dropping the lines wrapped so far,
+        to be wrapped again from the paragraph at anchor_para on.
+        Returns False if the width was already width."""
+        with self.lock:
+            if width == self.width:
+                return False
+            scale = self._get_est_scale()
+            self.width = width
+            self.lines = []
+            self.para_starts = []
+            self.first_para = self.next_para = min(anchor_para, len(self.paras))
+            self.head_est = sum(
+                self._get_para_est(p) for p in self.paras[: self.first_para]
+            )
+            self.line_base = math.ceil(self.head_est * scale)
+            self.wrapped_est = 0
+            self.total_est = sum(self._get_para_est(p) for p in self.paras)
+            return True
+
+    def get_para_of_line(self, idx: int) -> int:
+        """Returns the index of the paragraph of the line at idx, which
+        must have been wrapped (or of the first or last paragraph wrapped)."""
+        with self.lock:
+            return self.first_para + max(
+                bisect.bisect_right(self.para_starts, idx) - 1, 0
+            )
+
+    def get_line_of_para(self, para_idx: int) -> int:
+        """Returns the index of the first line of the paragraph at para_idx,
+        wrapping up to it if needed, or the index after the last line if
+        there's no such paragraph."""
+        with self.lock:
+            while self.first_para > para_idx:
+                self._wrap_prev_paras(self.line_base - 1)
+            while self.next_para <= para_idx and self.next_para < len(self.paras):
+                self._wrap_next_para()
+            if para_idx - self.first_para < len(self.para_starts):
+                return self.para_starts[para_idx - self.first_para]
+            return self.line_base + len(self.lines)
+
+    def _get_para_est(self, para: str) -> int:
+        return math.ceil(len(para) / self.width)
+
+    def _get_est_scale(self) -> float:
+        """Returns how many lines the paragraphs wrapped so far took per
+        estimated line, or 1 if none have been."""
+        return (self.wrapped_est and len(self.lines) / self.wrapped_est) or 1
+
+    def get_line(self, idx: int) -> str:
+        """Returns the line at idx, wrapping up to it if needed,
+        or an empty string if the article has no such line."""
+        self.wrap_to(idx + 1)
+        idx -= self.wrap_from(idx)
+        return (0 <= idx < len(self.lines) and self.lines[idx]) or ""
+
+    def is_all_wrapped(self) -> bool:
+        return self.first_para == 0 and self.next_para == len(self.paras)
+
+    def get_approx_len(self) -> int:
+        """Returns the index after the last line (the number of lines, unless
+        the first one's index isn't 0), estimating the lines of the paragraphs
+        not yet wrapped after the wrapped ones from their lengths, scaled by
+        how far off the estimate has been for the paragraphs wrapped so far.
+        Exact once every paragraph after the first wrapped one is wrapped."""
+        with self.lock:
+            line_end = self.line_base + len(self.lines)
+            if self.next_para == len(self.paras):
+                return line_end
+            unwrapped_est = self.total_est - self.wrapped_est - self.head_est
+            return line_end + math.ceil(unwrapped_est * self._get_est_scale())
@@ -0,0 +1,99 @@
+from __future__ import annotations
+import article
+import collections
+import sys
+import zlib
+
+
+class ArticleMemCache:
+    """In-memory LRU cache of loaded articles keyed by URL, bounded by bytes.
+
+    The most recently used articles are kept as they are, with their wrapped
+    lines and scroll offset. Colder ones are kept as compressed text plus
+    their offset and get rewrapped (lazily) if they're used again.
+
+    Attributes:
+        max_bytes: Byte budget of the cached articles.
+        hot_count: Number of most recently used articles kept uncompressed.
+        entries: OrderedDict of url to entry dict, least recently used first.
+            An entry has either an "art" Article (hot) or "ztxt" bytes (cold),
+            plus its "offset" and its approximate "size" in bytes.
+        MAX_BYTES: Default byte budget.
+        HOT_COUNT: Default hot count.
+    """
+
+    MAX_BYTES = 16 * 1024 * 1024
+    HOT_COUNT = 4
+
+    @staticmethod
+    def _get_art_size(art: article.Article) -> int:
+        lines = art.article_txt
+        return sum(sys.getsizeof(s) for s in lines.paras) + sum(
+            sys.getsizeof(s) for s in lines.lines
+        )
+
+    def __init__(self, max_bytes: int = MAX_BYTES, hot_count: int = HOT_COUNT):
+        self.max_bytes = max_bytes
+        self.hot_count = hot_count
+        self.entries: collections.OrderedDict[str, dict] = collections.OrderedDict()
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.entries
+
+    def get_total_bytes(self) -> int:
+        return sum(entry["size"] for entry in self.entries.values())
+
+    def get(self, url: str) -> article.Article | None:
+        """Returns the cached Article for url, decompressing it if it's cold,
+        or None if it isn't cached."""
+        entry = self.entries.get(url)
+        if entry is None:
+            return None
+        self.entries.move_to_end(url)
+        if entry.get("art") is None:
+            art = article.Article(url)
+            art.article_txt.append_txt(
+                zlib.decompress(entry.pop("ztxt")).decode("utf-8"), is_final=True
+            )
+            art.offset = max(entry["offset"], 0)  # It's counted from 0 again
+            art.is_loaded = True
+            entry["art"] = art
+        self._update()
+        return entry["art"]
+
+    def get_txt(self, url: str) -> str | None:
+        """Returns the text of url's cached article without using it
+        (its place in the LRU order is kept), or None if it isn't cached."""
+        entry = self.entries.get(url)
+        if entry is None:
+            return None
+        if entry.get("art") is None:
+            return zlib.decompress(entry["ztxt"]).decode("utf-8")
+        return entry["art"].article_txt.get_txt()
+
+    def put(self, art: article.Article) -> None:
+        """Caches art if it's finished loading and has text."""
+        if art.is_loaded and art.get_article_len():
+            self.entries[art.url] = {"art": art, "offset": art.offset, "size": 0}
+            self.entries.move_to_end(art.url)
+            self._update()
+
+    def _update(self) -> None:
+        """Compresses the entries past hot_count, resizes the hot ones
+        (their lines grow as they're read) and evicts down to max_bytes."""
+        for i, entry in enumerate(reversed(self.entries.values())):
+            art = entry.get("art")
+            if art is None:
+                continue
+            if i < self.hot_count:
+                entry["size"] = self._get_art_size(art)
+            else:
+                entry["offset"] = art.offset
+                entry["ztxt"] = zlib.compress(
+                    art.article_txt.get_txt().encode("utf-8"), 1
+                )
+                entry["size"] = sys.getsizeof(entry["ztxt"])
+                entry["art"] = None
+        total = self.get_total_bytes()
+        while total > self.max_bytes and len(self.entries) > 1:
+            total -= self.entries.popitem(last=False)[1]["size"]
@@ -0,0 +1,112 @@
+from __future__ import annotations
+import article
+import article_mem_cache
+import concurrent.futures
+import fetch_engine
+import threading
+
+
+class ArticlePrefetcher:
+    """Loads articles in the background so that they are ready,
+    or at least started, by the time they are selected.
+
+    Attributes:
+        engine: FetchEngine running the loads.
+        mem_cache: ArticleMemCache of the articles already loaded.
+        window: Number of headlines on each side of the selection to prefetch.
+        loads: Dict of url to a tuple of its Article and the Future of its load.
+        claimed_url: Url of the load last handed out by claim.
+        claimed: Tuple of the Article and Future last handed out by claim.
+        WINDOW: Default prefetch window.
+    """
+
+    WINDOW = 2
+
+    @staticmethod
+    def _get_done_future() -> concurrent.futures.Future:
+        future = concurrent.futures.Future()
+        future.set_result(None)
+        return future
+
+    def __init__(
+        self,
+        engine: fetch_engine.FetchEngine,
+        mem_cache: article_mem_cache.ArticleMemCache,
+        window: int = WINDOW,
+    ) -> None:
+        self.engine = engine
+        self.mem_cache = mem_cache
+        self.window = window
+        self.loads: dict[str, tuple[article.Article, concurrent.futures.Future]] = {}
+        self.claimed_url = ""
+        self.claimed: tuple[article.Article, concurrent.futures.Future] | None = None
+        self.lock = threading.Lock()
+
+    def _submit(self, url: str) -> tuple[article.Article, concurrent.futures.Future]:
+        art = article.Article(url)
+        return art, self.engine.submit(url, art.load_article_txt)
+
+    def set_wanted_urls(self, urls: list[str]) -> None:
+        """Takes in the urls to prefetch, most wanted first, drops the loads
+        for urls that are no longer wanted and queues the new ones in order.
+        Dropped loads that have finished go into mem_cache.
+        """
+        with self.lock:
+            for url in [u for u in self.loads if u not in urls]:
+                art, future = self.loads.pop(url)
+                if future.done():
+                    self.mem_cache.put(art)
+                else:
+                    art.cancel_load()
+                    future.cancel()
+            for url in urls:
+                if (
+                    url
+                    and url not in self.loads
+                    and url != self.claimed_url
+                    and url not in self.mem_cache
+                ):
+                    self.loads[url] = self._submit(url)
+
+    def get_loaded_txts(self, skip_urls: set[str]) -> dict[str, str]:
+        """Returns the text of each finished article, prefetched, claimed or in
+        mem_cache, by url, except those in skip_urls."""
+        with self.lock:
+            loads = list(self.loads.values()) + (
+                (self.claimed and [self.claimed]) or []
+            )
+            txts = {
+                art.url: art.article_txt.get_txt()
+                for art, future in loads
+                if art.url not in skip_urls and future.done() and art.is_loaded
+            }
+            for url in list(self.mem_cache.entries):
+                if url not in skip_urls and url not in txts:
+                    txts[url] = self.mem_cache.get_txt(url) or ""
+        return txts
+
+    def claim(self, url: str) -> tuple[article.Article, concurrent.futures.Future]:
+        """Returns the Article for url and the Future of its load, taking it
+        from mem_cache or taking over its prefetch so that it won't be dropped,
+        or starting a new load if there is neither.
+        Claiming url again gives back the same load while it's running or if
+        it got text, but starts a new one if it failed or came back empty.
+        The previously claimed article goes into mem_cache.
+        """
+        with self.lock:
+            if url == self.claimed_url and self.claimed:
+                art, future = self.claimed
+                if not future.done() or art.get_article_len():
+                    return self.claimed
+                self.claimed = None
+            if self.claimed and self.claimed[1].done():
+                self.mem_cache.put(self.claimed[0])
+            cached = self.mem_cache.get(url)
+            load = (cached and (cached, self._get_done_future())) or self.loads.pop(
+                url, None
+            )
+            if load is None or load[1].cancelled():
+                load = self._submit(url)
+            self.claimed_url = url
+            self.claimed = load
+            return load
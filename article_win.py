@@ -1,11 +1,29 @@
+from __future__ import annotations
 import news_win
 import article
 import headline_block
 import commands
+import article_prefetcher
+import concurrent.futures
+import curses
+import time
 
 
 class ArticleWin(news_win.NewsWin):
+    """The article window. The article's lines are drawn once, as they're
+    scrolled to, into an off-screen pad, and scrolling just moves the part
+    of the pad shown in the window's text region.
+
+    A pad holds fewer lines than a long article, so it holds them from
+    pad_base on, and is redrawn from REBASE_LINES above the view when the
+    view scrolls out of it.
+    """
+
     LINE_SPACING = 2  # Article line print spacing
+    LOADING_MSG = "Loading..."
+    PAD_ROWS = 256  # Initial pad height, doubled as lines are drawn into it
+    MAX_PAD_ROWS = 32000  # Curses pads can't be taller than 32767
+    REBASE_LINES = 1000  # Lines kept above the view when the pad is redrawn
 
     @classmethod
     def get_START_X(cls):
@@ -15,64 +33,201 @@ class ArticleWin(news_win.NewsWin):
     def get_LINE_RANGE(cls) -> range:
         return range(super().START_Y_TXT, super().END_Y_TXT, cls.LINE_SPACING)
 
-    def __init__(self):
+    @classmethod
+    def get_VIEW_ROWS(cls) -> int:
+        """Returns the height of the pad viewport in rows."""
+        return cls.get_LINE_RANGE()[-1] - cls.get_LINE_RANGE()[0] + 1
+
+    def __init__(self, prefetcher: article_prefetcher.ArticlePrefetcher):
         super().__init__(self.get_START_X())
         self.is_article_displayed = False
+        self.prefetcher = prefetcher
+        self.pending: concurrent.futures.Future | None = None  # Load of self.article
+        self.printed_len = 0  # Article length when it was last printed
+        self.pad = curses.newpad(self.PAD_ROWS, super().WIDTH_TXT + 1)
+        self.pad_base = 0  # Article line drawn at the top of the pad
+        self.pad_len = 0  # Article lines drawn into the pad, from pad_base
+        self.pad_top = 0  # Pad row at the top of the viewport
+        self.is_msg_in_pad = False
+        self.load_start = 0.0  # perf_counter when the article was selected
+        self.article: article.Article | None = None
 
     def set_article(self, article: article.Article):
         self.article = article
 
     def load_page(self, blk: headline_block.HeadlineBlock):
-        art = article.Article(blk.get_url())
-        art.set_article_txt()
-        self.set_article(art)
-        self.reset_win()
+        """Starts loading the block's article, or takes over its prefetch,
+        and shows the loading message until poll_article can print it.
+
+        Times itself as "article.load_page", and the wait until the article
+        is first printed as "article.open".
+        """
+        self.load_start = time.perf_counter()
+        with self.latency.time("article.load_page"):
+            art, self.pending = self.prefetcher.claim(blk.get_url())
+            art.set_width(super().WIDTH_TXT)  # If it was wrapped before a resize
+            self.set_article(art)
+            self.is_article_displayed = False
+            self.printed_len = 0
+            self.reset_win()
+            if not self.poll_article():
+                self.print_msg(self.LOADING_MSG)
+                self.refresh_win()
+
+    def poll_article(self) -> bool:
+        """Prints the loading article once it has a screenful of lines,
+        again whenever lines arrive that fall in view, and when it's done.
+        Returns True if it printed.
+        """
+        if not self.pending:
+            return False
+        is_done = self.pending.done()
+        if is_done:
+            self.pending = None
+        art_len = self.article.get_article_len()
+        line_cap = len(self.get_LINE_RANGE())
+        if not is_done and (art_len < line_cap or art_len == self.printed_len):
+            return False
+        if not is_done and self.printed_len >= self.article.offset + line_cap:
+            # The new lines are all below the view, so only enable scrolling.
+            self.set_displayed_status()
+            return False
+        if self.load_start:
+            self.latency.record("article.open", time.perf_counter() - self.load_start)
+            self.load_start = 0.0
         self.print_article()
         self.refresh_win()
+        return True
+
+    def resize(self) -> None:
+        """Remakes the window and pad at the current size (see NewsWin.set_size)
+        and reflows the article to the new width, without loading it again,
+        keeping the paragraph at the top of the view at the top."""
+        self.make_win(self.get_START_X())
+        self.pad = curses.newpad(self.PAD_ROWS, super().WIDTH_TXT + 1)
+        self.reset_win()
+        if not self.article:
+            return
+        self.article.set_width(super().WIDTH_TXT)
+        self.printed_len = 0
+        if not self.poll_article():
+            if self.pending:
+                self.print_msg(self.LOADING_MSG)
+            else:
+                self.print_article()
+        self.refresh_win()
 
     def move_vert(self, cmd: int):
-        incr = commands.Commands.get_vert_incr(cmd, is_article=True)
+        self.move_vert_by(
+            commands.Commands.get_article_incr(cmd, len(self.get_LINE_RANGE()))
+        )
+
+    def move_vert_by(self, incr: int) -> None:
+        """Scrolls the article by incr lines, stopping at its start or end."""
         if self.get_displayed_status():
             self.article.incr_offset(incr)
             self.print_article()
             self.refresh_win()
 
     def print_article(self):
+        """Draws any lines in view that aren't in the pad yet
+        and moves the viewport to the article's offset.
+
+        Times the wrapping of the lines ("article.wrap") and drawing them
+        ("article.paint") separately.
+        """
+        line_count = self.article.offset + len(self.get_LINE_RANGE())
+        with self.latency.time("article.wrap"):
+            self.article.article_txt.wrap_to(line_count)
+        self.printed_len = self.article.get_article_len()
         if self.article.get_article_len():
-            for i, ypos in enumerate(self.get_LINE_RANGE()):
-                if i < self.article.get_article_len():
-                    line = self.article.get_offset_line(i)
-                    print_string = line + self.get_blank_line_str(
-                        self.get_line_length_diff(line)
-                    )
-                else:
-                    print_string = self.get_blank_line_str()
-                self.print_article_line(ypos, print_string)
+            if self.is_msg_in_pad:
+                self.reset_win()
+            self.rebase_pad(line_count)
+            with self.latency.time("article.paint"):
+                self.draw_pad_lines(line_count)
+            self.pad_top = (self.article.offset - self.pad_base) * self.LINE_SPACING
+            self.ensure_pad_rows(self.pad_top + self.get_VIEW_ROWS())
             if self.article.get_article_len() > len(self.get_LINE_RANGE()):
                 self.set_displayed_status()
         else:
-            msg: str = "No article."
-            extra_spaces: str = self.get_blank_line_str(self.get_line_length_diff(msg))
-            self.print_article_line(self.get_LINE_RANGE()[0], msg + extra_spaces)
-            for i in self.get_LINE_RANGE()[1:]:
-                self.print_article_line(i, self.get_blank_line_str())
-        super().print_box()
+            self.print_msg("No article.")
+
+    @classmethod
+    def get_max_pad_lines(cls) -> int:
+        return (cls.MAX_PAD_ROWS - cls.get_VIEW_ROWS()) // cls.LINE_SPACING
+
+    def rebase_pad(self, line_count: int) -> None:
+        """Empties the pad and moves pad_base to REBASE_LINES above the view
+        (or the article's first line) if the pad is empty or the view, which
+        ends at line_count, doesn't fit in it."""
+        offset = self.article.offset
+        if (
+            self.pad_len
+            and self.pad_base <= offset
+            and line_count <= self.pad_base + self.get_max_pad_lines()
+        ):
+            return
+        self.reset_win()
+        self.pad_base = max(
+            offset - self.REBASE_LINES,
+            self.article.article_txt.wrap_from(offset - self.REBASE_LINES),
+        )
 
-    def get_line_length_diff(self, line: str) -> int:
-        return super().WIDTH_TXT - len(line)
+    def draw_pad_lines(self, line_count: int) -> None:
+        """Draws the article's lines into the pad up to line_count,
+        wrapping them if they haven't been yet."""
+        line_count = min(line_count - self.pad_base, self.get_max_pad_lines())
+        while self.pad_len < line_count:
+            line = self.article.article_txt.get_line(self.pad_base + self.pad_len)
+            if not line:
+                break
+            self.ensure_pad_rows(
+                self.pad_len * self.LINE_SPACING + self.get_VIEW_ROWS()
+            )
+            self.put_str(self.pad, self.pad_len * self.LINE_SPACING, 0, line)
+            self.pad_len += 1
 
-    def get_blank_line_str(self, num_spaces: int = -1) -> str:
-        if num_spaces < 0:
-            num_spaces = super().WIDTH_TXT
-        return " " * num_spaces
+    def ensure_pad_rows(self, rows: int) -> None:
+        pad_rows, pad_cols = self.pad.getmaxyx()
+        if pad_rows < rows:
+            self.pad.resize(min(max(rows, pad_rows * 2), self.MAX_PAD_ROWS), pad_cols)
 
-    def print_article_line(self, line_ypos: int, line_str: str) -> None:
-        self.win.addstr(line_ypos, super().START_X_TXT, line_str)
+    def print_msg(self, msg: str):
+        self.reset_win()
+        self.put_str(self.pad, 0, 0, msg)
+        self.is_msg_in_pad = True
 
     def reset_win(self):
-        for i in self.get_LINE_RANGE():
-            print_string = " " * super().WIDTH_TXT
-            self.win.addstr(i, super().START_X_TXT, print_string)
+        self.pad.erase()
+        if self.renderer:
+            self.renderer.forget(self.pad)
+        self.pad_base = 0
+        self.pad_len = 0
+        self.pad_top = 0
+        self.is_msg_in_pad = False
+
+    def get_pad_view(self) -> tuple[int, int, int, int, int, int]:
+        """Returns the pad rows and columns shown and where, in screen
+        coordinates, as taken by pad.noutrefresh."""
+        y = super().START_Y + self.get_LINE_RANGE()[0]
+        x = self.get_START_X() + super().START_X_TXT
+        return (
+            self.pad_top,
+            0,
+            y,
+            x,
+            y + self.get_VIEW_ROWS() - 1,
+            x + super().WIDTH_TXT - 1,
+        )
+
+    def refresh_win(self):
+        # The pad goes after the window, so the window can't cover it.
+        super().refresh_win()
+        if self.renderer:
+            self.renderer.stage(self.pad, *self.get_pad_view())
+        else:
+            self.pad.refresh(*self.get_pad_view())
 
     def set_displayed_status(self):
         self.is_article_displayed = True
@@ -0,0 +1,87 @@
+import collections
+import concurrent.futures
+import threading
+
+
+class BackgroundSaver:
+    """Runs saves one at a time, in the order they're requested, on a
+    background thread, so the UI thread doesn't wait for the disk.
+
+    Each save has a key (e.g. the file it writes). A save requested while
+    another with the same key is still waiting replaces it, and both
+    requests' futures get the result of the one save that runs, so saving
+    the same thing repeatedly only writes it once with the latest data.
+
+    Attributes:
+        pending: OrderedDict of key to the (fn, args, future) of the waiting saves.
+        stats: Dict of the saves requested, run, coalesced and failed.
+    """
+
+    def __init__(self) -> None:
+        self.pending: collections.OrderedDict[str, tuple] = collections.OrderedDict()
+        self.cond = threading.Condition()
+        self.is_busy = False  # Whether a save is running
+        self.is_stopped = False
+        self.thread: threading.Thread | None = None
+        self.stats = {"requested": 0, "saved": 0, "coalesced": 0, "failed": 0}
+
+    def submit(self, key: str, fn, *args) -> concurrent.futures.Future:
+        """Schedules fn(*args) and returns a future of its result, which is
+        the future of the waiting save with the same key, if there is one."""
+        with self.cond:
+            if self.is_stopped:
+                raise RuntimeError("cannot submit saves after shutdown")
+            self.stats["requested"] += 1
+            future = concurrent.futures.Future()
+            if key in self.pending:
+                future = self.pending[key][2]
+                self.stats["coalesced"] += 1
+            self.pending[key] = (fn, args, future)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+            self.cond.notify_all()
+        return future
+
+    def _run(self) -> None:
+        while True:
+            with self.cond:
+                while not self.pending and not self.is_stopped:
+                    self.cond.wait()
+                if not self.pending:
+                    return
+                key, (fn, args, future) = self.pending.popitem(last=False)
+                self.is_busy = True
+            outcome = ""  # The stats counter to count the save in, if it ran
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args))
+                    outcome = "saved"
+                except Exception as e:
+                    future.set_exception(e)
+                    outcome = "failed"
+            with self.cond:
+                if outcome:
+                    self.stats[outcome] += 1
+                self.is_busy = False
+                self.cond.notify_all()
+
+    def get_stats(self) -> dict:
+        with self.cond:
+            return dict(self.stats)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Waits until every requested save has run.
+        Returns False if timeout seconds passed first."""
+        with self.cond:
+            return self.cond.wait_for(
+                lambda: not self.pending and not self.is_busy, timeout
+            )
+
+    def shutdown(self) -> None:
+        """Runs the waiting saves and stops the background thread."""
+        with self.cond:
+            self.is_stopped = True
+            self.cond.notify_all()
+        if self.thread:
+            self.thread.join()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+import tracemalloc
+import fixture_server
+import headline_block
+import headline_block_list
+import helper_extras
+import news_snapshot
+import news_win
+import article
+import article_win
+
+SIZES = [20, 1000, 100000]
+MAX_OPS = 10000  # Most operations timed per run of a per-item benchmark
+THRESHOLD = 1.25  # Slowdown ratio past which a result counts as a regression
+
+
+def get_feed(size: int) -> list[dict]:
+    return fixture_server.make_articles(
+        fixture_server.read_template(), size, "https://bench.invalid/articles/"
+    )
+
+
+def get_pages(paths: list[str]) -> dict[str, str]:
+    """Returns the saved pages at paths by name, or a synthetic page of
+    each fixture size if there are none."""
+    pages = {}
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            pages[path] = f.read()
+    for page_kb in (not pages and (8, 64, 256)) or ():
+        pages[f"synthetic{page_kb}k"] = fixture_server.make_page(page_kb, page_kb)
+    return pages
+
+
+def time_best(fn, repeat: int) -> float:
+    """Returns the fastest of repeat runs of fn, in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def bench_hblist_build(feed: list[dict]):
+    return lambda: headline_block_list.HeadlineBlockList(feed), len(feed)
+
+
+def bench_visi_range(feed: list[dict]):
+    hbl = headline_block_list.HeadlineBlockList(feed)
+    step = max(len(feed) // MAX_OPS, 1)
+    idxs = range(0, len(feed), step)
+
+    def run():
+        for i in idxs:
+            hbl.get_visi_range(hbl.get_visi_range_start(i))
+
+    return run, len(idxs)
+
+
+def bench_incr_selection(feed: list[dict]):
+    hbl = headline_block_list.HeadlineBlockList(feed)
+    steps = min(len(feed) - 1, MAX_OPS // 2)
+
+    def run():
+        for _ in range(steps):
+            hbl.incr_selection_idx(1)
+        for _ in range(steps):
+            hbl.incr_selection_idx(-1)
+
+    return run, steps * 2
+
+
+def bench_disp_txt(feed: list[dict]):
+    blks = [headline_block.HeadlineBlock(**article) for article in feed[:MAX_OPS]]
+    lines = [line for blk in blks for line in blk.lines]
+    for i, line in enumerate(lines):
+        line.offset_horiz = i % 8
+
+    def run():
+        for line in lines:
+            line.get_disp_txt()
+
+    return run, len(lines)
+
+
+def get_visi_blocks(data) -> list:
+    """Makes the headline list of data and the blocks of its first screen,
+    as the reader does before its first paint."""
+    hbl = headline_block_list.HeadlineBlockList(data)
+    return [hbl.get_block_at_idx(i) for i in hbl.get_visi_range()]
+
+
+def bench_open_json(feed: list[dict]):
+    path = os.path.join(tempfile.gettempdir(), f"bench_feed{len(feed)}.json")
+    helper_extras.write_json_file(path, {"articles": feed})
+    return lambda: get_visi_blocks(helper_extras.read_json_file(path)["articles"]), 1
+
+
+def bench_open_snapshot(feed: list[dict]):
+    path = os.path.join(tempfile.gettempdir(), f"bench_feed{len(feed)}.snap")
+    news_snapshot.SnapshotFile.write(path, feed)
+
+    def run():
+        get_visi_blocks(
+            news_snapshot.SnapshotArticles(news_snapshot.SnapshotFile(path))
+        )
+
+    return run, 1
+
+
+def get_hblist_memory(feed: list[dict]) -> dict:
+    """Returns the bytes allocated building a HeadlineBlockList of feed
+    and scrolling through it, in all and per headline."""
+    tracemalloc.start()
+    hbl = headline_block_list.HeadlineBlockList(feed)
+    for _ in range(min(len(feed) - 1, MAX_OPS)):
+        hbl.incr_selection_idx(1)
+        hbl.get_visi_range()
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return {
+        "bytes": allocated,
+        "bytes_per_headline": allocated / len(feed),
+        "blocks": len(hbl.blocks),
+    }
+
+
+def get_page_txt(page: str) -> str:
+    return article.Article.get_text_maker().handle(page)
+
+
+def bench_incr_offset(page: str):
+    txt = get_page_txt(page)
+    state = {}
+
+    def run():
+        # A fresh article each run, so the lines are wrapped as they're scrolled to
+        art = article.Article("https://bench.invalid/")
+        art.article_txt.append_txt(txt, is_final=True)
+        art.is_loaded = True
+        state["art"] = art
+        for _ in range(MAX_OPS):
+            offset = art.offset
+            art.incr_offset(1)
+            if art.offset == offset:
+                break
+
+    run()
+    return run, state["art"].offset or 1
+
+
+def bench_reflow(page: str):
+    """Times resizing the article window in the middle of an article:
+    rewrapping it to the other width up to the end of the view."""
+    art = article.Article("https://bench.invalid/")
+    art.article_txt.append_txt(get_page_txt(page), is_final=True)
+    art.incr_offset(art.get_article_len() // 2)
+    widths = [news_win.NewsWin.WIDTH_TXT, news_win.NewsWin.WIDTH_TXT + 20]
+    view_len = len(article_win.ArticleWin.get_LINE_RANGE())
+
+    def run():
+        widths.reverse()
+        art.set_width(widths[0])
+        art.article_txt.wrap_to(art.offset + view_len)
+
+    return run, 1
+
+
+def bench_textwrap(page: str):
+    paras = [p for p in get_page_txt(page).split("\n") if p.strip()]
+    return (
+        lambda: [textwrap.wrap(p, width=news_win.NewsWin.WIDTH_TXT) for p in paras]
+    ), len(paras)
+
+
+def bench_html2text(page: str):
+    return lambda: get_page_txt(page), 1
+
+
+def get_import_seconds(module: str) -> float:
+    """Returns how long importing module takes in a new interpreter."""
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+    return float(
+        subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+    )
+
+
+FEED_BENCHES = {
+    "hblist_build": bench_hblist_build,
+    "visi_range": bench_visi_range,
+    "incr_selection_idx": bench_incr_selection,
+    "get_disp_txt": bench_disp_txt,
+    "open_json": bench_open_json,
+    "open_snapshot": bench_open_snapshot,
+}
+PAGE_BENCHES = {
+    "incr_offset": bench_incr_offset,
+    "reflow": bench_reflow,
+    "textwrap": bench_textwrap,
+    "html2text": bench_html2text,
+}
+
+
+def run(
+    sizes: list[int], page_paths: list[str], repeat: int = 5, only: str = ""
+) -> dict:
+    """Runs the benchmarks whose names contain only, returning the results
+    by "name[size or page]" with the best time and the time per operation."""
+    results = {}
+    cases = [
+        (f"{name}[{size}]", bench, lambda size=size: get_feed(size))
+        for size in sizes
+        for name, bench in FEED_BENCHES.items()
+    ] + [
+        (f"{name}[{page_name}]", bench, lambda page=page: page)
+        for page_name, page in get_pages(page_paths).items()
+        for name, bench in PAGE_BENCHES.items()
+    ]
+    data_cache = {}  # Each feed is only built once, and only if it's used
+    for key, bench, get_data in cases:
+        if only not in key:
+            continue
+        data_key = key[key.index("[") :]
+        if data_key not in data_cache:
+            data_cache = {data_key: get_data()}
+        fn, ops = bench(data_cache[data_key])
+        seconds = time_best(fn, repeat)
+        results[key] = {
+            "seconds": seconds,
+            "ops": ops,
+            "us_per_op": seconds / ops * 1e6,
+        }
+        print(f"{key:40} {seconds * 1000:10.3f} ms {seconds / ops * 1e6:10.3f} us/op")
+    key = "import[news_reader]"  # The import part of the startup time
+    if only in key:
+        seconds = min(get_import_seconds("news_reader") for _ in range(repeat))
+        results[key] = {"seconds": seconds, "ops": 1, "us_per_op": seconds * 1e6}
+        print(f"{key:40} {seconds * 1000:10.3f} ms")
+    memory = {}
+    for size in sizes:
+        key = f"hblist_memory[{size}]"
+        if only in key:
+            memory[key] = get_hblist_memory(get_feed(size))
+            print(f"{key:40} {memory[key]['bytes_per_headline']:10.1f} B/headline")
+    return {
+        "memory": memory,
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float = THRESHOLD) -> list[str]:
+    """Prints how each result compares with the baseline's,
+    returning the keys of the ones slower by more than threshold."""
+    regressions = []
+    base_results = baseline.get("results") or {}
+    print(f"{'benchmark':40} {'base us/op':>12} {'us/op':>12} {'ratio':>7}")
+    for key, result in report["results"].items():
+        base = base_results.get(key)
+        if not base:
+            print(f"{key:40} {'-':>12} {result['us_per_op']:12.3f}")
+            continue
+        ratio = result["us_per_op"] / (base["us_per_op"] or 1e-9)
+        flag = ""
+        if ratio > threshold:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print(
+            f"{key:40} {base['us_per_op']:12.3f} {result['us_per_op']:12.3f} "
+            f"{ratio:7.2f}{flag}"
+        )
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="Time the headline and article hot paths on synthetic feeds "
+        "and saved pages, optionally comparing against a baseline."
+    )
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    arg_parser.add_argument(
+        "--pages", nargs="*", default=[], help="Saved html pages (default: synthetic)"
+    )
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument("--only", default="", help="Run the benchmarks matching")
+    arg_parser.add_argument("--out", default="bench.json", help="Results file")
+    arg_parser.add_argument("--compare", help="Baseline results file to compare to")
+    arg_parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = arg_parser.parse_args()
+    report = run(args.sizes, args.pages, args.repeat, args.only)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) past {args.threshold}x")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
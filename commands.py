@@ -10,12 +10,24 @@ class Commands:
     SECONDARY_LINE_RIGHT = 108  # l
     ARTICLE_DOWN = 106  # j
     ARTICLE_UP = 107  # k
+    ARTICLE_PAGE_DOWN = curses.KEY_NPAGE  # 338
+    ARTICLE_PAGE_UP = curses.KEY_PPAGE  # 339
+    ARTICLE_TOP = 103  # g
+    ARTICLE_BOTTOM = 71  # G
     ARTICLE_SELECT = 10  # enter
     OPEN_BROWSER = 98  # b
     OPEN_BROWSER_TWELVE_FT = 116  # t
     OPEN_BROWSER_ARCHIVE = 97  # a
     SAVE_HEADLINES = 115  # s
+    REFRESH_HEADLINES = 114  # r
+    SEARCH = 47  # /
+    SEARCH_NEXT = 110  # n
+    SEARCH_PREV = 78  # N
+    STATS_OVERLAY = 105  # i
+    SAVE_STATS = 101  # e
+    PROFILE = 112  # p
     QUIT = 113  # q
+    ARTICLE_JUMP = 1 << 30  # Increment past any article's start or end
 
     @classmethod
     def get_vert_incr(cls, cmd: int, is_article: bool = False) -> int:
@@ -25,6 +37,43 @@ class Commands:
         down_cmd = (is_article and cls.ARTICLE_DOWN) or cls.HEADLINES_DOWN
         return ((cmd - down_cmd) and -1) or 1
 
+    @classmethod
+    def get_article_incr(cls, cmd: int, page_len: int) -> int:
+        """Returns the article offset increment of one of the article scrolling
+        commands. Pages keep one line of the previous page in view; top and
+        bottom go past the start or end, where the offset gets clamped.
+        """
+        return {
+            cls.ARTICLE_DOWN: 1,
+            cls.ARTICLE_UP: -1,
+            cls.ARTICLE_PAGE_DOWN: page_len - 1,
+            cls.ARTICLE_PAGE_UP: 1 - page_len,
+            cls.ARTICLE_TOP: -cls.ARTICLE_JUMP,
+            cls.ARTICLE_BOTTOM: cls.ARTICLE_JUMP,
+        }.get(cmd, 0)
+
+    @classmethod
+    def get_move_group(cls, cmd: int) -> str | None:
+        """Returns which window a scrolling command moves through ("headlines"
+        or "article lines"), for the commands whose runs can be merged into
+        one move, or None for other commands."""
+        if cmd in (cls.HEADLINES_DOWN, cls.HEADLINES_UP):
+            return "headlines"
+        if cmd in (
+            cls.ARTICLE_DOWN,
+            cls.ARTICLE_UP,
+            cls.ARTICLE_PAGE_DOWN,
+            cls.ARTICLE_PAGE_UP,
+        ):
+            return "article lines"
+
+    @classmethod
+    def get_move_incr(cls, cmd: int, page_len: int) -> int:
+        """Returns the increment of one of the commands get_move_group groups."""
+        if cmd in (cls.HEADLINES_DOWN, cls.HEADLINES_UP):
+            return cls.get_vert_incr(cmd)
+        return cls.get_article_incr(cmd, page_len)
+
     @classmethod
     def get_horiz_incr(cls, cmd: int, is_main_line: bool = True) -> int:
         """A positive increment advances (moves right) through the block line.
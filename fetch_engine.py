@@ -0,0 +1,73 @@
+from __future__ import annotations
+import asyncio
+import concurrent.futures
+import threading
+import typing
+import urllib.parse
+
+if typing.TYPE_CHECKING:
+    import session_profiler
+
+
+class FetchEngine:
+    """Runs blocking fetches concurrently on an asyncio event loop in a
+    background thread, limiting how many run at once against each host.
+
+    Callers on the curses thread get a concurrent.futures.Future back from
+    submit and poll it, so the main loop never blocks on the network.
+
+    Attributes:
+        loop: The asyncio event loop running in the engine thread.
+        executor: Worker pool the blocking fetches run on.
+        host_limit: Max number of fetches running at once per host.
+        host_semaphores: Dict of host to its semaphore (engine thread only).
+        profiler: SessionProfiler whose wrap the fetches are run through,
+            so they're profiled while it runs, or None.
+        WORKERS: Default number of worker threads running fetches.
+        HOST_LIMIT: Default per-host concurrency limit.
+    """
+
+    WORKERS = 6
+    HOST_LIMIT = 2
+
+    @staticmethod
+    def _get_host(url: str) -> str:
+        return urllib.parse.urlsplit(url).netloc.lower()
+
+    def __init__(self, workers: int = WORKERS, host_limit: int = HOST_LIMIT) -> None:
+        self.loop = asyncio.new_event_loop()
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(workers, 1), thread_name_prefix="fetch"
+        )
+        self.loop.set_default_executor(self.executor)
+        self.host_limit = max(host_limit, 1)
+        self.host_semaphores: dict[str, asyncio.Semaphore] = {}
+        self.profiler: session_profiler.SessionProfiler | None = None
+        self.thread = threading.Thread(
+            target=self.loop.run_forever, name="fetch-engine", daemon=True
+        )
+        self.thread.start()
+
+    async def _run(self, host: str, fn, args: tuple):
+        semaphore = self.host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self.host_semaphores[host] = asyncio.Semaphore(self.host_limit)
+        async with semaphore:
+            return await self.loop.run_in_executor(None, fn, *args)
+
+    def submit(self, url: str, fn, *args) -> concurrent.futures.Future:
+        """Schedules fn(*args) as a fetch against url's host.
+
+        Fetches start in submission order as their host's limit allows.
+        Cancelling the returned future drops the fetch if it hasn't started,
+        or discards its result if it has.
+        """
+        if self.profiler:
+            fn = self.profiler.wrap(fn)
+        return asyncio.run_coroutine_threadsafe(
+            self._run(self._get_host(url), fn, args), self.loop
+        )
+
+    def shutdown(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.executor.shutdown(wait=False, cancel_futures=True)
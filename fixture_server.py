@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+
+import argparse
+import copy
+import http.server
+import json
+import os
+import random
+import threading
+import time
+import urllib.parse
+import zlib
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), "news_sample1.json")
+WORDS = (
+    "the minister said on tuesday that talks would resume after a week of "
+    "protests in the capital where officials reported record turnout and "
+    "markets fell sharply as investors weighed new data on inflation jobs "
+    "and growth while analysts warned of further delays to the budget"
+).split()
+
+
+def read_template(sample_path: str = SAMPLE_PATH) -> list[dict]:
+    """Returns the articles of a saved newsapi response to make fixtures from."""
+    with open(sample_path, encoding="utf-8") as f:
+        return json.load(f).get("articles") or [{}]
+
+
+def make_articles(
+    template: list[dict], count: int, url_base: str, first_id: int = 0
+) -> list[dict]:
+    """Returns count articles cycled from template, each with a unique
+    url (url_base followed by its id) and title."""
+    articles = []
+    for i in range(count):
+        a = copy.deepcopy(template[i % len(template)])
+        a["url"] = f"{url_base}{first_id + i}"
+        a["title"] = f"{a.get('title') or 'Headline'} ({first_id + i})"
+        articles.append(a)
+    return articles
+
+
+def make_page(article_id: int, page_kb: int) -> str:
+    """Returns a deterministic article page of about page_kb KiB,
+    with some page chrome around an <article> body."""
+    rand = random.Random(article_id)
+    paras = []
+    size = 0
+    while size < page_kb * 1024:
+        para = " ".join(rand.choice(WORDS) for _ in range(rand.randint(40, 120)))
+        paras.append(f"<p>{para.capitalize()}.</p>")
+        size += len(para) + 8
+    return (
+        f"<html><head><title>Article {article_id}</title></head><body>"
+        '<nav class="menu"><a href="/">Home</a> <a href="/world">World</a></nav>'
+        f"<article><h1>Article {article_id}</h1>{''.join(paras)}</article>"
+        '<footer class="footer">Copyright fixture news</footer></body></html>'
+    )
+
+
+class FixtureServer(http.server.ThreadingHTTPServer):
+    """Local stand-in for newsapi and the publisher sites, for load testing
+    the fetch, cache and prefetch paths without a network.
+
+    Serves news_sample1.json-shaped responses on /v2/top-headlines and
+    /v2/everything whose article urls point back at this server, and a
+    synthetic article page on any other path. Point the app at it with
+    SessionPool's base_url (or NewsReader's), which sends every request,
+    newsapi's and the articles', to this server.
+
+    Attributes:
+        base_url: String of the url of the server, e.g. "http://127.0.0.1:8080".
+        latency: Seconds each response is delayed by.
+        jitter: Max extra random seconds each response is delayed by.
+        articles: Number of articles in each newsapi response.
+        page_kb: Approximate size of each article page in KiB.
+        chunk_delay: Seconds between each CHUNK_BYTES of a page, to drip it.
+        error_rate: Fraction of requests answered with a 500 error.
+        etags: "on" to send ETags and answer matching requests with 304,
+            "off" to send none, "changing" to send a new one every time.
+        template: List of the article dicts the responses are made from.
+        stats: Dict of the counts of requests, not_modified and errors by path kind.
+    """
+
+    ARTICLES = 20
+    PAGE_KB = 24
+    CHUNK_BYTES = 4096
+    ETAG_MODES = ("on", "off", "changing")
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        articles: int = ARTICLES,
+        page_kb: int = PAGE_KB,
+        chunk_delay: float = 0.0,
+        error_rate: float = 0.0,
+        etags: str = "on",
+        sample_path: str = SAMPLE_PATH,
+    ) -> None:
+        super().__init__((host, port), FixtureRequestHandler)
+        self.daemon_threads = True
+        self.base_url = f"http://{host}:{self.server_address[1]}"
+        self.latency = latency
+        self.jitter = jitter
+        self.articles = articles
+        self.page_kb = page_kb
+        self.chunk_delay = chunk_delay
+        self.error_rate = error_rate
+        self.etags = etags
+        self.template = read_template(sample_path)
+        self.stats: dict[str, dict[str, int]] = {}
+        self.etag_counter = 0
+        self.lock = threading.Lock()
+        self.thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Serves in a daemon thread until shutdown is called."""
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    def count(self, kind: str, stat: str) -> None:
+        with self.lock:
+            kind_stats = self.stats.setdefault(
+                kind, {"requests": 0, "not_modified": 0, "errors": 0}
+            )
+            kind_stats[stat] += 1
+
+    def get_etag(self, article_id: int) -> str | None:
+        if self.etags == "off":
+            return None
+        if self.etags == "changing":
+            with self.lock:
+                self.etag_counter += 1
+                return f'"fx-{article_id}-{self.etag_counter}"'
+        return f'"fx-{article_id}"'
+
+    def get_response(self, endpoint: str, params: dict) -> dict:
+        """Returns a newsapi response object of articles cycled from the
+        template, with ids (and so urls) that depend on the endpoint and query."""
+        first_id = 0
+        if endpoint == "everything":
+            query = (params.get("q") or [""])[0]
+            first_id = (zlib.crc32(query.encode("utf-8")) % 9999 + 1) * 1000
+        count = int((params.get("pageSize") or [self.articles])[0])
+        articles = make_articles(
+            self.template, count, self.base_url + "/articles/", first_id
+        )
+        return {"status": "ok", "totalResults": count, "articles": articles}
+
+    def get_page(self, article_id: int) -> bytes:
+        return make_page(article_id, self.page_kb).encode("utf-8")
+
+
+class FixtureRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real servers
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server: FixtureServer = self.server
+        url = urllib.parse.urlsplit(self.path)
+        endpoint = url.path.rstrip("/").split("/")[-1]
+        kind = (url.path.startswith("/v2/") and endpoint) or "articles"
+        server.count(kind, "requests")
+        time.sleep(server.latency + random.uniform(0, server.jitter))
+        if random.random() < server.error_rate:
+            server.count(kind, "errors")
+            self._send_json(
+                500,
+                {
+                    "status": "error",
+                    "code": "unexpectedError",
+                    "message": "Fixture server error.",
+                },
+            )
+        elif kind != "articles":
+            self._send_json(
+                200, server.get_response(endpoint, urllib.parse.parse_qs(url.query))
+            )
+        else:
+            self._send_page(
+                int(endpoint)
+                if endpoint.isdigit()
+                else zlib.crc32(url.path.encode("utf-8"))
+            )
+
+    def _send_json(self, status: int, data: dict) -> None:
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_page(self, article_id: int) -> None:
+        server: FixtureServer = self.server
+        etag = server.get_etag(article_id)
+        if etag and self.headers.get("If-None-Match") == etag:
+            server.count("articles", "not_modified")
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = server.get_page(article_id)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        for start in range(0, len(body), server.CHUNK_BYTES):
+            self.wfile.write(body[start : start + server.CHUNK_BYTES])
+            self.wfile.flush()
+            if server.chunk_delay:
+                time.sleep(server.chunk_delay)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="Serve stand-in newsapi responses and article pages locally."
+    )
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8080)
+    arg_parser.add_argument("--latency", type=float, default=0.0, help="Seconds")
+    arg_parser.add_argument("--jitter", type=float, default=0.0, help="Seconds")
+    arg_parser.add_argument("--articles", type=int, default=FixtureServer.ARTICLES)
+    arg_parser.add_argument("--page-kb", type=int, default=FixtureServer.PAGE_KB)
+    arg_parser.add_argument("--chunk-delay", type=float, default=0.0, help="Seconds")
+    arg_parser.add_argument("--error-rate", type=float, default=0.0)
+    arg_parser.add_argument("--etags", choices=FixtureServer.ETAG_MODES, default="on")
+    args = arg_parser.parse_args()
+    server = FixtureServer(
+        args.host,
+        args.port,
+        args.latency,
+        args.jitter,
+        args.articles,
+        args.page_kb,
+        args.chunk_delay,
+        args.error_rate,
+        args.etags,
+    )
+    print(f"Serving on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+from __future__ import annotations
 import headline_block_line
 import curses
 
@@ -11,6 +12,15 @@ class HeadlineBlock:
     ]
 
     def __init__(self, **kwargs):
+        self.lines: list[headline_block_line.HeadlineBlockLine] = [
+            headline_block_line.HeadlineBlockLine((not i), "")
+            for i in range(len(self.LINE_CONTENTS_TYPES))
+        ]
+        self.set_headline(**kwargs)
+
+    def set_headline(self, **kwargs) -> None:
+        """Sets the block to show the article in kwargs, so that blocks can be
+        reused for other articles as the headlines scroll."""
         s = kwargs.get("source")
         self.source = s and s["name"]
         self.title = kwargs.get("title")
@@ -19,13 +29,8 @@ class HeadlineBlock:
         self.url = kwargs.get("url") or ""
         self.description = kwargs.get("description")
         self.content = kwargs.get("content")
-        self.lines: list[headline_block_line.HeadlineBlockLine] = []
-        for i, contents_type in enumerate(self.LINE_CONTENTS_TYPES):
-            self.lines.append(
-                headline_block_line.HeadlineBlockLine(
-                    (not i), getattr(self, contents_type, "")
-                )
-            )
+        for line, contents_type in zip(self.lines, self.LINE_CONTENTS_TYPES):
+            line.set_full_txt(getattr(self, contents_type, ""))
         self.selection_status = False
         hblist_idx_temp = kwargs.get("hblist_idx")
         if not type(hblist_idx_temp) is int:
@@ -38,6 +43,9 @@ class HeadlineBlock:
     def toggle_selection_status(self) -> None:
         self.selection_status = not self.selection_status
 
+    def set_selection_status(self, selection_status: bool) -> None:
+        self.selection_status = selection_status
+
     def get_selector_char(self) -> str:
         return (self.selection_status and "*") or " "
 
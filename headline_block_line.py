@@ -17,20 +17,26 @@ class HeadlineBlockLine:
         self.full_txt = full_txt
         self.offset_horiz = 0  # Horizontal display offset factor
 
+    def set_full_txt(self, full_txt: str) -> None:
+        self.full_txt = full_txt
+        self.reset_offset_horiz()
+
     def get_ypos_in_blk(self) -> int:
         return (
             not self.is_main_line and self.YPOS_IN_BLK_OPTS[1]
         ) or self.YPOS_IN_BLK_OPTS[0]
 
     def print_sel_char(self, win: curses.window, block_visi_pos: int, sel_char: str):
-        win.addch(
+        news_win.NewsWin.put_str(
+            win,
             self.new_get_ypos_in_txt(block_visi_pos),
             headlines_win.HeadlinesWin.get_START_X_SELECTOR(),
             sel_char,
         )
 
     def print_self(self, win: curses.window, block_visi_pos: int):
-        win.addstr(
+        news_win.NewsWin.put_str(
+            win,
             self.new_get_ypos_in_txt(block_visi_pos),
             news_win.NewsWin.START_X_TXT,
             self.get_disp_txt(),
@@ -59,11 +65,13 @@ class HeadlineBlockLine:
         self.offset_horiz = 0
 
     def get_disp_txt(self) -> str:
-        # TODO: Create custom exception for if the length of the string
-        # returned by this method is less than NewsWin.WIDTH_TXT
+        # Padded to the full width so reprinting over a longer line clears it.
         return (
-            self.full_txt
-            and self.full_txt[
-                self.offset_horiz : self.offset_horiz + news_win.NewsWin.WIDTH_TXT
-            ]
-        ) or " " * news_win.NewsWin.WIDTH_TXT
+            (
+                self.full_txt
+                and self.full_txt[
+                    self.offset_horiz : self.offset_horiz + news_win.NewsWin.WIDTH_TXT
+                ]
+            )
+            or ""
+        ).ljust(news_win.NewsWin.WIDTH_TXT)
@@ -1,17 +1,38 @@
+from __future__ import annotations
 import headlines_win
 import headline_block
+import headline_store
+import news_snapshot
 import curses
 import helper
+import sys
 
 
 class HeadlineBlockList:
+    """The headlines, kept in a compact HeadlineStore, with HeadlineBlocks made
+    only for the ones in use (the visible range and the selection) and reused
+    for other headlines as the range scrolls.
+
+    Attributes:
+        store: HeadlineStore of all the headlines (a SnapshotHeadlineStore,
+            reading them as they're used, if data is a SnapshotArticles).
+        blocks: Dict of headline index to its HeadlineBlock, for the headlines in use.
+        urls: Set of the urls of all the headlines, made by get_urls when
+            first needed (merging), or None until then.
+        selection_idx: Index of the selected headline.
+        SPARE_BLOCKS: Number of blocks kept beyond the visible range's.
+    """
+
+    SPARE_BLOCKS = 2
+
     def __init__(self, data: list[dict]):
-        self.headlines = [
-            headline_block.HeadlineBlock(hblist_idx=i, **article)
-            for i, article in enumerate(data)
-        ]
+        if isinstance(data, news_snapshot.SnapshotArticles):
+            self.store = headline_store.SnapshotHeadlineStore(data)
+        else:
+            self.store = headline_store.HeadlineStore(data)
+        self.blocks: dict[int, headline_block.HeadlineBlock] = {}
+        self.urls: set[str] | None = None
         self.selection_idx: int = 0
-        self.get_selection_blk().toggle_selection_status()
 
     def get_visi_range_start(self, sel_idx: int = -1) -> int:
         if sel_idx < 0:
@@ -25,16 +46,31 @@ class HeadlineBlockList:
         elif sel_idx < headlines_win.HeadlinesWin.get_BLOCK_CAP_MID():
             return 0
         else:
-            return self.get_len() - headlines_win.HeadlinesWin.get_BLOCK_CAP()
+            # Feeds shorter than a screenful start at the top
+            return max(0, self.get_len() - headlines_win.HeadlinesWin.get_BLOCK_CAP())
 
     def get_visi_range(self, visi_range_start: int = -1):
         if visi_range_start < 0:
             visi_range_start = self.get_visi_range_start()
         return range(
             visi_range_start,
-            visi_range_start + headlines_win.HeadlinesWin.get_BLOCK_CAP(),
+            min(
+                visi_range_start + headlines_win.HeadlinesWin.get_BLOCK_CAP(),
+                self.get_len(),
+            ),
         )
 
+    def get_neighbour_idxs(self, window: int) -> list[int]:
+        """Returns the indexes within window of the selection that are in the
+        visible range, ordered by distance from the selection (selection first).
+        """
+        sel_idx = self.get_selection_idx()
+        visi_range = self.get_visi_range()
+        idxs = [sel_idx]
+        for dist in range(1, window + 1):
+            idxs += [sel_idx + dist, sel_idx - dist]
+        return [i for i in idxs if i in visi_range and i in range(self.get_len())]
+
     def print_block_at_idx(self, win: curses.window, idx: int):
         self.get_block_at_idx(idx).new_print_block(win, self.get_visi_range_start())
 
@@ -44,8 +80,10 @@ class HeadlineBlockList:
     def incr_selection_idx(self, incr: int) -> None:
         old_idx: int = self.get_selection_idx()
         self.selection_idx += incr
-        self.toggle_block_selection_status(old_idx)
-        self.toggle_block_selection_status(self.get_selection_idx())
+        # Blocks made later get their selection status when they're made.
+        for idx in (old_idx, self.get_selection_idx()):
+            if idx in self.blocks:
+                self.blocks[idx].set_selection_status(idx == self.get_selection_idx())
 
     def toggle_block_selection_status(self, idx: int):
         self.get_block_at_idx(idx).toggle_selection_status()
@@ -56,11 +94,19 @@ class HeadlineBlockList:
     def new_print_blocks(self, win: curses.window):
         for i in self.get_visi_range():
             self.print_block_at_idx(win, i)
+            self.print_block_selector_char(win, i)
 
     def get_block_at_idx(self, idx: int) -> headline_block.HeadlineBlock:
+        """Returns the block of the headline at idx, setting up a block
+        for it (a reused one if there are enough) if it has none."""
+        if idx < 0:
+            idx += self.get_len()  # Like indexing a list
+        blk = self.blocks.get(idx)
+        if blk is not None:
+            return blk
         # TODO: Try-catch idx out of range
         try:
-            return self.headlines[idx]
+            article = self.store.get_article(idx)
         except IndexError:
             h = helper.Helper()
             h.save_debug_txt(
@@ -73,6 +119,26 @@ class HeadlineBlockList:
                 4,
             )
             raise
+        blk = self._take_unused_block()
+        if blk is None:
+            blk = headline_block.HeadlineBlock(hblist_idx=idx, **article)
+        else:
+            blk.set_headline(hblist_idx=idx, **article)
+        blk.set_selection_status(idx == self.get_selection_idx())
+        self.blocks[idx] = blk
+        return blk
+
+    def _take_unused_block(self) -> headline_block.HeadlineBlock | None:
+        """Removes and returns a block that's out of the visible range and not
+        selected, if there are enough blocks to spare one."""
+        block_cap = headlines_win.HeadlinesWin.get_BLOCK_CAP() + self.SPARE_BLOCKS
+        if len(self.blocks) < block_cap:
+            return None
+        visi_range = self.get_visi_range()
+        for idx in self.blocks:
+            if idx not in visi_range and idx != self.get_selection_idx():
+                return self.blocks.pop(idx)
+        return None
 
     def print_block_selector_char(self, win: curses.window, idx: int = -1) -> None:
         if idx < 0:
@@ -90,5 +156,49 @@ class HeadlineBlockList:
         selected_block.incr_line_horiz_offset(is_main_line, incr)
         selected_block.new_print_line(win, is_main_line, self.get_visi_range_start())
 
+    def merge_headlines(self, data: list[dict]) -> list[dict]:
+        """Inserts the articles in data whose urls aren't in the list yet
+        at the top, keeping the selection on the same block.
+
+        Returns:
+            The list of the inserted articles.
+        """
+        new_articles = []
+        urls = self.get_urls()
+        for article in data:
+            url = article.get("url") or ""
+            if url and url not in urls:
+                urls.add(url)
+                new_articles.append(article)
+        if new_articles:
+            self.store.insert_front(new_articles)
+            for blk in self.blocks.values():
+                blk.hblist_idx += len(new_articles)
+            self.blocks = {blk.hblist_idx: blk for blk in self.blocks.values()}
+            self.selection_idx += len(new_articles)
+        return new_articles
+
+    def get_urls(self) -> set[str]:
+        if self.urls is None:
+            self.urls = {url or "" for url in self.store.get_urls()}
+        return self.urls
+
+    def get_idx_of_url(self, url: str) -> int:
+        """Returns the index of the headline with url, or -1 if there's none."""
+        return self.store.get_idx_of_url(url)
+
     def get_len(self):
-        return len(self.headlines)
+        return len(self.store)
+
+    def get_memory_stats(self) -> dict:
+        """Returns the number of headlines and of blocks, and the bytes the
+        list keeps per headline (in the store and the url set)."""
+        store_bytes = self.store.get_bytes()
+        urls_bytes = sys.getsizeof(self.get_urls())
+        return {
+            "headlines": self.get_len(),
+            "blocks": len(self.blocks),
+            "store_bytes": store_bytes,
+            "url_set_bytes": urls_bytes,
+            "bytes_per_headline": (store_bytes + urls_bytes) / (self.get_len() or 1),
+        }
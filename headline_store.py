@@ -0,0 +1,112 @@
+import sys
+import news_snapshot
+
+
+class HeadlineStore:
+    """Compact columnar store of the newsapi article fields the headline
+    blocks show, one list per field, so a headline costs a slot in each
+    list rather than a HeadlineBlock and its lines.
+
+    Attributes:
+        One list per name in FIELDS, with the field of every article in order.
+        FIELDS: The newsapi article fields kept (those HeadlineBlock uses).
+    """
+
+    FIELDS = (
+        "source",
+        "title",
+        "publishedAt",
+        "author",
+        "url",
+        "description",
+        "content",
+    )
+    __slots__ = FIELDS
+
+    def __init__(self, data: list[dict]) -> None:
+        for field in self.FIELDS:
+            setattr(self, field, [article.get(field) for article in data])
+
+    def __len__(self) -> int:
+        return len(self.url)
+
+    def get_article(self, idx: int) -> dict:
+        """Returns the kept fields of the article at idx as a newsapi article dict."""
+        return {field: getattr(self, field)[idx] for field in self.FIELDS}
+
+    def get_url(self, idx: int) -> str:
+        return self.url[idx] or ""
+
+    def get_urls(self) -> list[str | None]:
+        return self.url
+
+    def get_idx_of_url(self, url: str) -> int:
+        """Returns the index of the article with url, or -1 if there's none."""
+        try:
+            return self.url.index(url)
+        except ValueError:
+            return -1
+
+    def insert_front(self, data: list[dict]) -> None:
+        for field in self.FIELDS:
+            getattr(self, field)[:0] = [article.get(field) for article in data]
+
+    def get_bytes(self) -> int:
+        """Returns the bytes of the store's own lists, not counting the field
+        values, which are shared with the articles they came from."""
+        return sys.getsizeof(self) + sum(
+            sys.getsizeof(getattr(self, field)) for field in self.FIELDS
+        )
+
+
+class SnapshotHeadlineStore(HeadlineStore):
+    """HeadlineStore that reads the headlines of a memory-mapped snapshot
+    when they're used instead of copying them. Headlines inserted in front
+    (by merges) are kept in the lists, as in HeadlineStore.
+
+    Attributes:
+        snapshot: The SnapshotFile, whose articles follow the ones in the lists.
+        snapshot_idxs: Dict of url to the index in snapshot of its first
+            article, made by get_idx_of_url when first needed, or None until then.
+    """
+
+    __slots__ = ("snapshot", "snapshot_idxs")
+
+    def __init__(self, articles: news_snapshot.SnapshotArticles) -> None:
+        super().__init__(articles.front)
+        self.snapshot = articles.file
+        self.snapshot_idxs: dict[str, int] | None = None
+
+    def __len__(self) -> int:
+        return len(self.url) + len(self.snapshot)
+
+    def get_article(self, idx: int) -> dict:
+        if idx < len(self.url):
+            return super().get_article(idx)
+        return self.snapshot.get_article(idx - len(self.url))
+
+    def get_url(self, idx: int) -> str:
+        if idx < len(self.url):
+            return super().get_url(idx)
+        return self.snapshot.get_field("url", idx - len(self.url)) or ""
+
+    def get_urls(self) -> list[str | None]:
+        return self.url + self.snapshot.get_column("url")
+
+    def get_idx_of_url(self, url: str) -> int:
+        idx = super().get_idx_of_url(url)
+        if idx >= 0:
+            return idx
+        if self.snapshot_idxs is None:
+            urls = self.snapshot.get_column("url")
+            self.snapshot_idxs = {
+                urls[i]: i for i in reversed(range(len(urls))) if urls[i]
+            }
+        snapshot_idx = self.snapshot_idxs.get(url)
+        return (snapshot_idx is None and -1) or len(self.url) + snapshot_idx
+
+    def get_bytes(self) -> int:
+        """Returns the bytes of the store's own lists and of snapshot_idxs."""
+        return super().get_bytes() + (
+            (self.snapshot_idxs is not None and sys.getsizeof(self.snapshot_idxs)) or 0
+        )
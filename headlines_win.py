@@ -1,7 +1,11 @@
+from __future__ import annotations
 import news_win
 import headline_block_list
 import commands
-import webbrowser
+import typing
+
+if typing.TYPE_CHECKING:
+    import article_prefetcher
 
 
 class HeadlinesWin(news_win.NewsWin):
@@ -26,9 +30,21 @@ class HeadlinesWin(news_win.NewsWin):
     def get_BLOCK_CAP_MID_DIFF(cls) -> int:
         return cls.get_BLOCK_CAP() - cls.get_BLOCK_CAP_MID()
 
-    def __init__(self, data: list) -> None:
+    def __init__(
+        self,
+        data: list,
+        prefetcher: article_prefetcher.ArticlePrefetcher | None = None,
+    ) -> None:
         super().__init__(self.START_X)
         self.headline_blocks = headline_block_list.HeadlineBlockList(data)
+        self.prefetcher = prefetcher
+
+    def resize(self) -> None:
+        """Remakes the window at the current size (see NewsWin.set_size).
+        The blocks are printed again by new_init_blocks."""
+        self.make_win(self.START_X)
+        for blk in self.headline_blocks.blocks.values():
+            blk.reset_horiz_offsets()
 
     def move_horiz(self, cmd, is_main_line: bool = True) -> None:
         incr = commands.Commands.get_horiz_incr(cmd, is_main_line)
@@ -38,18 +54,52 @@ class HeadlinesWin(news_win.NewsWin):
     def new_init_blocks(self) -> None:
         self.headline_blocks.new_print_blocks(self.win)
         self.headline_blocks.print_block_selector_char(self.win)
+        self.prefetch_around_selection()
+
+    def prefetch_around_selection(self) -> None:
+        if self.prefetcher:
+            self.prefetcher.set_wanted_urls(
+                [
+                    self.headline_blocks.get_block_at_idx(i).get_url()
+                    for i in self.headline_blocks.get_neighbour_idxs(
+                        self.prefetcher.window
+                    )
+                ]
+            )
 
     def new_move_vert(self, cmd: int) -> None:
         # Arrow down is increment of 1. Arrow up is increment of -1.
-        selection_incr: int = commands.Commands.get_vert_incr(cmd)
+        self.move_vert_by(commands.Commands.get_vert_incr(cmd))
+
+    def move_vert_by(self, incr: int) -> None:
+        """Moves the selection by incr headlines, stopping at the first or last."""
+        sel_idx = self.headline_blocks.get_selection_idx()
+        idx = min(max(sel_idx + incr, 0), self.headline_blocks.get_len() - 1)
+        with self.latency.time("headlines.move"):
+            self.move_selection(idx - sel_idx)
+
+    def select_idx(self, idx: int) -> None:
+        """Moves the selection to the headline at idx."""
+        self.move_selection(idx - self.headline_blocks.get_selection_idx())
+
+    def move_selection(self, selection_incr: int) -> None:
+        """Moves the selection by selection_incr headlines, if that's in range,
+        repainting the old and new selection, or the whole visible range if
+        it moved."""
+        if not selection_incr:
+            return
         old_selection_idx: int = self.headline_blocks.get_selection_idx()
         if old_selection_idx + selection_incr in range(
             0, self.headline_blocks.get_len()
         ):
             self.headline_blocks.incr_selection_idx(selection_incr)
             self.headline_blocks.reset_horizontal_offsets_at_idx(old_selection_idx)
-            self.headline_blocks.print_block_at_idx(self.win, old_selection_idx)
-            self.headline_blocks.print_block_selector_char(self.win, old_selection_idx)
+            # After a jump (e.g. to a search result) it can be out of view
+            if old_selection_idx in self.headline_blocks.get_visi_range():
+                self.headline_blocks.print_block_at_idx(self.win, old_selection_idx)
+                self.headline_blocks.print_block_selector_char(
+                    self.win, old_selection_idx
+                )
             old_visi_range_start = self.headline_blocks.get_visi_range_start(
                 old_selection_idx
             )
@@ -57,8 +107,35 @@ class HeadlinesWin(news_win.NewsWin):
                 self.headline_blocks.new_print_blocks(self.win)
             self.headline_blocks.print_block_selector_char(self.win)
             self.refresh_win()
+            self.prefetch_around_selection()
+
+    def merge_headlines(self, data: list[dict]) -> list[dict]:
+        """Merges new headlines into the list (see HeadlineBlockList.merge_headlines)
+        and reprints only the visible blocks that changed.
+
+        Returns:
+            The list of the inserted articles.
+        """
+        hbl = self.headline_blocks
+        old_visi_urls = [
+            hbl.get_block_at_idx(i).get_url() for i in hbl.get_visi_range()
+        ]
+        new_articles = hbl.merge_headlines(data)
+        if new_articles:
+            for visi_pos, idx in enumerate(hbl.get_visi_range()):
+                # A list shorter than the window can have grown into it
+                if old_visi_urls[visi_pos : visi_pos + 1] != [
+                    hbl.get_block_at_idx(idx).get_url()
+                ]:
+                    hbl.print_block_at_idx(self.win, idx)
+                    hbl.print_block_selector_char(self.win, idx)
+            self.refresh_win()
+            self.prefetch_around_selection()
+        return new_articles
 
     def load_selected_in_browser(self, prefix_choice: str | None) -> None:
+        import webbrowser  # Only needed here, and slow to import
+
         webbrowser.open_new(
             self.headline_blocks.get_selection_blk().get_url(prefix_choice)
         )
@@ -1,12 +1,24 @@
 #!/usr/bin/env python3
 
+from __future__ import annotations
+import hashlib
 import json
 import os
 import datetime
+import glob
 import random
+import concurrent.futures
+import time
 import helper_extras
+import background_saver
 import warnings
-import newsapi
+import news_archive
+import news_snapshot
+import session_pool
+import typing
+
+if typing.TYPE_CHECKING:
+    import pstats
 
 
 class Helper:
@@ -20,11 +32,27 @@ class Helper:
 
     Attributes:
         news_path: String of the path to the local news file.
+        cache_path_base: String of the path to the local article cache directory.
+        sessions: SessionPool to make newsapi requests through, or None.
         keys_path: String of the path to the local keys file.
         news_keys: List of dicts from the keys file.
         news_key_choice: String of the chosen API key to use in fetch.
         news_data_all: Dict of the API response object.
         news_data: List of dicts from the response object's 'articles' field.
+        fetch_timings: List of dicts timing each request of the last fan-out
+            (spec, seconds, articles, error), slowest first.
+        response_ttl: Seconds a cached newsapi response is used for
+            instead of querying again. 0 turns off the response cache.
+        response_path_base: String of the path base of the cached responses,
+            which are named by a hash of their request parameters.
+        is_news_stale: Boolean of whether news_data is from a cached response
+            older than response_ttl, or from the archive while there's no cached
+            response (see set_news_from_newsapi).
+        news_source: String of where news_data came from: "cache", "stale cache",
+            "archive", "newsapi", "file" or "snapshot".
+        archive_path: String of the path to the headline archive database.
+        archive: NewsArchive of saved headlines, opened when first used, or None.
+        saver: BackgroundSaver that saves news files and archives headlines.
         HOME: OS-dependent "HOME" filepath.
         API_DEFAULT: API key name lookup failure fallback.
 
@@ -34,6 +62,10 @@ class Helper:
 
     HOME = os.getenv("HOME", "")
     API_DEFAULT = "newsapi"
+    FANOUT_WORKERS = 4  # Most requests a fan-out makes at once
+    RESPONSE_TTL = 900
+    NEWSAPI_URL = "https://newsapi.org/v2/top-headlines"  # Without importing newsapi
+    FIRST_PAINT_LIMIT = 200  # Most archived headlines shown while news is fetched
 
     @staticmethod
     def _is_list_of_dicts(candidate) -> bool:
@@ -51,6 +83,10 @@ class Helper:
     def _get_json_filename(path: str, path_counter: int | str) -> str:
         return path + str(path_counter) + ".json"
 
+    @staticmethod
+    def _get_prof_filename(path: str, path_counter: int | str) -> str:
+        return path + str(path_counter) + ".prof"
+
     @staticmethod
     def _get_day(prev_days: int) -> str:
         """Takes in an integer and returns the date that many
@@ -73,12 +109,26 @@ class Helper:
         keys_path: str = os.path.join(HOME, "news_keys.json"),
         debug_path_base: str = os.path.join(HOME, "news_debug"),
         use_saved: bool = False,
+        cache_path_base: str = os.path.join(HOME, "news_cache"),
+        sessions: session_pool.SessionPool | None = None,
+        response_ttl: float = RESPONSE_TTL,
+        archive_path: str = news_archive.NewsArchive.DEFAULT_PATH,
     ) -> None:
         self.news_path_base = news_path_base
         self.keys_path = keys_path
         self.debug_path_base = debug_path_base
+        self.cache_path_base = cache_path_base
+        self.sessions = sessions
         self.news_data: list[dict] = []
         self.news_data_all: dict = {}
+        self.fetch_timings: list[dict] = []
+        self.response_ttl = response_ttl
+        self.response_path_base = os.path.join(cache_path_base, "newsapi_")
+        self.is_news_stale = False
+        self.news_source = ""
+        self.archive_path = archive_path
+        self.archive: news_archive.NewsArchive | None = None
+        self.saver = background_saver.BackgroundSaver()
         if not use_saved:
             self._set_keys()
 
@@ -141,16 +191,85 @@ class Helper:
 
     def set_news_from_newsapi(self, **kwargs) -> None:
         """Queries "newsapi" API and saves response to helper.news.
+        Takes the same kwargs as get_news_from_newsapi.
+
+        A cached response is used instead if there is one, even if it's older
+        than response_ttl (stale-while-revalidate), or failing that the newest
+        archived headlines in the same language: is_news_stale is then set,
+        so the caller can show them right away and refresh them in the background.
+        """
+        response = self.get_cached_news_from_newsapi(**kwargs)
+        self.news_source = "cache"
+        if response is None and self.response_ttl > 0:
+            response = self.get_cached_news_from_newsapi(max_age=-1, **kwargs)
+            self.news_source = "stale cache"
+        if response is None and os.path.exists(self.archive_path):
+            response = self.get_news_from_archive(
+                lang=self.get_newsapi_lang(**kwargs), limit=self.FIRST_PAINT_LIMIT
+            )
+            response = (response["articles"] and response) or None
+            self.news_source = "archive"
+        self.is_news_stale = response is not None and self.news_source != "cache"
+        if response is None:
+            response = self.get_news_from_newsapi(**kwargs)
+            self.news_source = "newsapi"
+        self._set_news_data(response)
+
+    def _get_newsapi_params(self, **kwargs) -> dict:
+        """Returns the request parameters of get_news_from_newsapi kwargs,
+        with their defaults filled in, as used to key the response cache."""
+        top: bool = (kwargs.get("top") is None and True) or bool(
+            kwargs.get("top")
+        )  # Default is True, but this fanciness is needed for a one-liner since None and
+        # False both eval to False, meaning kwargs.get("top") or True will always be True.
+        lang: str = kwargs.get("lang") or "en"
+        query: str = kwargs.get("query") or ""
+        prev_days: int = kwargs.get("prev_days") or 0
+        sort_pop: bool = (kwargs.get("sort_pop") is None and True) or bool(
+            kwargs.get("sort_pop")
+        )
+        if top:
+            return {"top": True, "lang": lang}
+        return {
+            "top": False,
+            "lang": lang,
+            "query": query,
+            "day": self._get_day(prev_days),
+            "sort": (sort_pop and "popularity") or "relevancy",
+        }
+
+    def get_newsapi_lang(self, **kwargs) -> str | None:
+        """Returns the language get_news_from_newsapi kwargs fetch news in,
+        or None if their specs are in more than one."""
+        specs = kwargs.get("specs") or [kwargs]
+        langs = {self._get_newsapi_params(**spec)["lang"] for spec in specs}
+        return (len(langs) == 1 and langs.pop()) or None
+
+    def _get_response_key(self, params: dict) -> str:
+        return hashlib.sha1(
+            json.dumps(params, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def get_news_from_newsapi(self, max_age: float | None = None, **kwargs) -> dict:
+        """Queries "newsapi" API and returns the response object,
+        or the cached response for the same request if it's recent enough.
 
         Uses the key from local keys file associated with "newsapi"
         e.g. {'api': "newsapi", 'apikey': "your_key_here"}
 
+        Args:
+            max_age: Seconds old a cached response can be to be used instead of
+                querying. Default: response_ttl. 0 always queries.
+
         Kwargs:
             top: Boolean to choose "top headlines" or "everything" endpoint.
             lang: String of the 2-letter ISO-639-1 language code. Options:
             query: String to search for articles (only used if top is False).
             prev_days: Number of days before today to get news from. Default: 0.
             sort_pop: Boolean to sort results by popularity or relevance (if top False).
+            specs: List of dicts of the above kwargs, one per request. If given,
+                the requests are made concurrently and the other kwargs are ignored.
+                See get_news_from_newsapi_specs.
 
         Raises:
             NewsKeysException: If self._set_news_key_choice() fails.
@@ -159,44 +278,254 @@ class Helper:
         lang options: ar de en es fr he it nl no pt ru se ud zh
         Advanced query options: https://newsapi.org/docs/endpoints/everything
         """
-        top: bool = (kwargs.get("top") is None and True) or bool(
-            kwargs.get("top")
-        )  # Default is True, but this fanciness is needed for a one-liner since None and
-        # False both eval to False, meaning kwargs.get("top") or True will always be True.
-        lang: str = kwargs.get("lang") or "en"
-        query: str = kwargs.get("query") or ""
-        prev_days: int = kwargs.get("prev_days") or 0
-        sort_pop: bool = (kwargs.get("sort_pop") is None and True) or bool(
-            kwargs.get("sort_pop")
-        )
+        if kwargs.get("specs"):
+            return self.get_news_from_newsapi_specs(kwargs["specs"], max_age)
+        params = self._get_newsapi_params(**kwargs)
+        response = self._get_cached_response(params, max_age)
+        if response is not None:
+            return response
         self._set_news_key_choice("newsapi")
-        newsapi_client = newsapi.NewsApiClient(self.news_key_choice)
-        if lang not in helper_extras.LANG_OPTIONS:
+        # Deferred, as it's slow to import and cached news may do
+        newsapi = helper_extras.import_module("newsapi")
+        newsapi_client = newsapi.NewsApiClient(
+            self.news_key_choice,
+            session=self.sessions and self.sessions.get_session(self.NEWSAPI_URL),
+        )
+        if params["lang"] not in helper_extras.LANG_OPTIONS:
             warnings.warn(
                 "lang must be one of: ar de en es fr he it nl no pt ru se ud zh\ndefaulting to en"
             )
-        if top:
+        if params["top"]:
             response = newsapi_client.get_top_headlines(
-                category="general", language=lang
+                category="general", language=params["lang"]
             )
         else:
             default_queries = ["china", "ukraine", "war", "election"]
-            query = query or random.choice(default_queries)
-            sort = (sort_pop and "popularity") or "relevancy"
-            day = self._get_day(prev_days)
             response = newsapi_client.get_everything(
-                q=query, from_param=day, sort_by=sort, language=lang
+                q=params["query"] or random.choice(default_queries),
+                from_param=params["day"],
+                sort_by=params["sort"],
+                language=params["lang"],
             )
-        self._set_news_data(response)
+        self._put_cached_response(params, response)
+        return response
+
+    def get_cached_news_from_newsapi(
+        self, max_age: float | None = None, **kwargs
+    ) -> dict | None:
+        """Returns the cached response object for get_news_from_newsapi kwargs
+        if it's at most max_age seconds old (default: response_ttl; -1: any age),
+        or None if it isn't cached. With specs, every spec must be cached.
+        """
+        specs = kwargs.get("specs") or [kwargs]
+        responses = [
+            self._get_cached_response(self._get_newsapi_params(**spec), max_age)
+            for spec in specs
+        ]
+        if None in responses:
+            return None
+        if not kwargs.get("specs"):
+            return responses[0]
+        return self._merge_responses(responses)
+
+    def _get_cached_response(self, params: dict, max_age: float | None) -> dict | None:
+        max_age = (max_age is None and self.response_ttl) or max_age
+        if not max_age:
+            return None
+        filename = self._get_json_filename(
+            self.response_path_base, self._get_response_key(params)
+        )
+        try:
+            if max_age > 0 and time.time() - os.path.getmtime(filename) > max_age:
+                return None
+            return self._read_json_file_newsapi(filename)
+        except (OSError, ValueError):
+            return None
+
+    def _put_cached_response(self, params: dict, response) -> None:
+        if not (
+            self.response_ttl
+            and type(response) is dict
+            and self._is_list_of_dicts(response.get("articles"))
+        ):
+            return
+        try:
+            os.makedirs(os.path.dirname(self.response_path_base), exist_ok=True)
+            self._write_json_file(
+                self.response_path_base, self._get_response_key(params), response
+            )
+        except OSError:
+            pass
+
+    def get_news_from_newsapi_specs(
+        self, specs: list[dict], max_age: float | None = None
+    ) -> dict:
+        """Queries "newsapi" API once per spec, on a thread pool, and returns
+        a response object of all their articles, deduplicated by url and
+        sorted by publishedAt, newest first.
+
+        Each spec is a dict of get_news_from_newsapi kwargs, e.g.
+        [{'lang': "en"}, {'top': False, 'query': "election", 'lang': "fr"}]
+        max_age applies to each spec as in get_news_from_newsapi.
+
+        How long each request took is recorded in fetch_timings. A failed
+        request is recorded there and skipped, unless every request failed.
+
+        Raises:
+            The exception of the first spec if every request failed.
+        """
+        timings = []
+        responses = []
+        with concurrent.futures.ThreadPoolExecutor(
+            min(len(specs), self.FANOUT_WORKERS)
+        ) as executor:
+            futures = [
+                executor.submit(self._get_timed_news_from_newsapi, spec, max_age)
+                for spec in specs
+            ]
+        for spec, future in zip(specs, futures):
+            response, seconds = future.result()
+            error = (isinstance(response, Exception) and repr(response)) or None
+            articles = (
+                type(response) is dict
+                and self._is_list_of_dicts(response.get("articles"))
+                and response["articles"]
+            ) or []
+            timings.append(
+                {
+                    "spec": spec,
+                    "seconds": seconds,
+                    "articles": len(articles),
+                    "error": error,
+                }
+            )
+            if not error:
+                responses.append(response)
+        self.fetch_timings = sorted(timings, key=lambda t: t["seconds"], reverse=True)
+        if not responses:
+            raise futures[0].result()[0]
+        return self._merge_responses(responses)
+
+    def _merge_responses(self, responses: list) -> dict:
+        """Returns a response object of the articles of responses,
+        deduplicated by url and sorted by publishedAt, newest first."""
+        merged = sorted(
+            (
+                a
+                for response in responses
+                if type(response) is dict
+                and self._is_list_of_dicts(response.get("articles"))
+                for a in response["articles"]
+            ),
+            key=lambda a: a.get("publishedAt") or "",
+            reverse=True,
+        )
+        urls = set()
+        articles = []
+        for a in merged:
+            if a.get("url") not in urls:
+                urls.add(a.get("url"))
+                articles.append(a)
+        return {"status": "ok", "totalResults": len(articles), "articles": articles}
+
+    def _get_timed_news_from_newsapi(
+        self, spec: dict, max_age: float | None = None
+    ) -> tuple:
+        """Returns the response (or the exception raised) for spec
+        and how many seconds the request took."""
+        start = time.perf_counter()
+        try:
+            response = self.get_news_from_newsapi(max_age, **dict(spec, specs=None))
+        except Exception as e:
+            response = e
+        return response, time.perf_counter() - start
 
     def set_news_from_newsapi_file(self, path_counter: int | str = "") -> None:
         """Sets self.news_data to the parsed JSON from a local file
         containing a newsapi response object.
         """
-        self._set_news_data(
-            self._read_json_file_newsapi(
-                self._get_json_filename(self.news_path_base, path_counter)
-            )
+        self._set_news_data(self.get_news_from_newsapi_file(path_counter))
+        self.news_source = "file"
+
+    def get_news_from_newsapi_file(self, path_counter: int | str = "") -> dict:
+        """Returns the parsed JSON from a local file
+        containing a newsapi response object, or from its gzipped form
+        (saved with compress) if there's no uncompressed file.
+        """
+        filename = self._get_json_filename(self.news_path_base, path_counter)
+        if not os.path.exists(filename) and os.path.exists(filename + ".gz"):
+            filename += ".gz"
+        return self._read_json_file_newsapi(filename)
+
+    def get_snapshot_filename(self, path_counter: int | str = "") -> str:
+        return self.news_path_base + str(path_counter) + ".snap"
+
+    def set_news_from_snapshot(self, path_counter: int | str = "") -> None:
+        """Sets self.news_data to the articles of a snapshot saved with
+        save_news(snapshot=True). The snapshot is memory-mapped rather than
+        read, and an article's dict is only made when it's used.
+
+        Raises:
+            OSError: If the snapshot can't be opened.
+            ValueError: If the file isn't a snapshot.
+            NewsDataException: If the snapshot has no articles.
+        """
+        articles = news_snapshot.SnapshotArticles(
+            news_snapshot.SnapshotFile(self.get_snapshot_filename(path_counter))
+        )
+        if not len(articles):
+            raise helper_extras.NewsDataException("The snapshot has no articles.")
+        self.news_data = articles
+        self.news_data_all = {
+            "status": "ok",
+            "totalResults": len(articles),
+            "articles": articles,
+        }
+        self.news_source = "snapshot"
+
+    def get_archive(self) -> news_archive.NewsArchive:
+        if self.archive is None:
+            self.archive = news_archive.NewsArchive(self.archive_path)
+        return self.archive
+
+    def set_news_from_archive(self, **kwargs) -> None:
+        """Sets self.news_data to a window of the archived headlines.
+        Takes the same kwargs as get_news_from_archive."""
+        self._set_news_data(self.get_news_from_archive(**kwargs))
+        self.news_source = "archive"
+
+    def get_news_from_archive(self, **kwargs) -> dict:
+        """Returns a window of the archived headlines, newest first,
+        as a newsapi response object.
+
+        Kwargs:
+            hours: Only headlines published in the last this many hours.
+            sources: List of the sources (names or newsapi ids) to include.
+            lang: Only headlines archived with this language code.
+            limit: Most headlines to return.
+        """
+        return self.get_archive().get_response(**kwargs)
+
+    def archive_news(self, lang: str | None = None) -> concurrent.futures.Future:
+        """Starts adding the current headlines to the archive in the
+        background, recording that they're in lang if given.
+
+        Returns:
+            Future of how many of the headlines weren't archived yet.
+        """
+        return self.saver.submit(
+            self.archive_path,
+            self.get_archive().add_articles,
+            self.get_news_data().copy(),
+            lang,
+        )
+
+    def import_news_files(self, lang: str | None = None) -> int:
+        """Adds the headlines of every saved news file (news_path_base*.json,
+        gzipped or not) to the archive and returns how many weren't archived yet."""
+        pattern = self._get_json_filename(self.news_path_base, "*")
+        return self.get_archive().import_files(
+            sorted(glob.glob(pattern) + glob.glob(pattern + ".gz")), lang
         )
 
     def _set_news_data(self, data) -> None:
@@ -218,6 +547,14 @@ class Helper:
         except helper_extras.NewsException:
             raise
 
+    def add_news_data(self, articles: list[dict]) -> None:
+        """Inserts articles at the start of news_data (and so of the
+        articles field of news_data_all, which is the same list)."""
+        if isinstance(self.news_data, news_snapshot.SnapshotArticles):
+            self.news_data.insert_front(articles)
+        else:
+            self.news_data[:0] = articles
+
     def get_news_data(self) -> list[dict]:
         # TODO: Pass string to Exception objects instead of using the print statements.
         try:
@@ -242,11 +579,53 @@ class Helper:
             )
             raise
 
-    def save_news(self, path_counter: int | str = "") -> None:
-        self._write_json_file(
-            self.news_path_base, path_counter, self.get_news_data_all()
+    def save_news(
+        self,
+        path_counter: int | str = "",
+        compress: bool = False,
+        snapshot: bool = False,
+    ) -> concurrent.futures.Future:
+        """Starts saving the newsapi response object in the background.
+        Saving again before an earlier save of the same file has started
+        only saves it once, with the latest data. The file in the other form
+        (compressed or not) is removed, so reading doesn't find an old one.
+
+        Args:
+            path_counter: Suffix of the file name, as read by
+                get_news_from_newsapi_file.
+            compress: Whether to gzip the file (adding .gz to its name).
+            snapshot: Whether to also save a snapshot of the articles
+                (.snap instead of .json), as read by set_news_from_snapshot.
+
+        Returns:
+            Future of the save, whose exception is the OSError if it failed.
+        """
+        data = dict(self.get_news_data_all())
+        data["articles"] = data["articles"].copy()  # news_data may grow meanwhile
+        return self.saver.submit(
+            self._get_json_filename(self.news_path_base, path_counter),
+            self._write_news_files,
+            path_counter,
+            data,
+            compress,
+            snapshot,
         )
 
+    def _write_news_files(
+        self, path_counter: int | str, data: dict, compress: bool, snapshot: bool
+    ) -> None:
+        data["articles"] = list(data["articles"])  # Makes a snapshot's dicts
+        self._write_json_file(self.news_path_base, path_counter, data, None, compress)
+        filename = self._get_json_filename(self.news_path_base, path_counter)
+        try:
+            os.remove((not compress and filename + ".gz") or filename)
+        except FileNotFoundError:
+            pass
+        if snapshot:
+            news_snapshot.SnapshotFile.write(
+                self.get_snapshot_filename(path_counter), data["articles"]
+            )
+
     def save_debug_json(
         self, data: dict | list | object, path_counter: int | str = ""
     ) -> None:
@@ -261,26 +640,52 @@ class Helper:
     def save_debug_txt(self, data, path_counter: int | str = "") -> None:
         self._write_txt_file(self.debug_path_base, path_counter, data)
 
+    def save_debug_profile(
+        self, stats: pstats.Stats, txt: str, path_counter: int | str = ""
+    ) -> str:
+        """Saves profiler stats, with their call graph, as a .prof file
+        (for pstats, snakeviz, gprof2dot etc.) and txt, a readable summary
+        of them, as a .txt file.
+
+        Returns:
+            The filename of the .prof file.
+
+        Raises:
+            OSError: If a file can't be written.
+        """
+        filename = self._get_prof_filename(self.debug_path_base, path_counter)
+        stats.dump_stats(filename)
+        self.save_debug_txt(txt, path_counter)
+        return filename
+
     def _write_json_file(
-        self, path: str, path_counter, data: dict | list | object, encoder=None
+        self,
+        path: str,
+        path_counter,
+        data: dict | list | object,
+        encoder=None,
+        compress: bool = False,
     ) -> None:
         """
-        Writes a dict, list, or class instance as json to a local file.
+        Writes a dict, list, or class instance as json to a local file,
+        atomically (see helper_extras.write_json_file).
         To write a class instance, pass NewsDebugEncoder to encoder param.
 
         Args:
             path: The filepath to write to.
             data: The data to write.
             encoder: The encoder class to use to convert a class instance to JSON.
+            compress: Whether to gzip the file (adding .gz to its name).
 
         Raises:
-            TODO
+            OSError: If the file can't be written. The old file is left as it was.
         """
-        # TODO: try/catch OSError
-        with open(
-            self._get_json_filename(path, path_counter), "w", encoding="utf-8"
-        ) as f:
-            json.dump(data, f, ensure_ascii=False, cls=encoder)
+        helper_extras.write_json_file(
+            self._get_json_filename(path, path_counter) + ((compress and ".gz") or ""),
+            data,
+            encoder,
+            compress,
+        )
 
     def _write_txt_file(self, path, path_counter: int | str, data) -> None:
         # TODO: try/catch OSError
@@ -288,7 +693,8 @@ class Helper:
             f.write(data)
 
     def _read_json_file_newsapi(self, path: str) -> dict:
-        """Reads and returns the contents of the JSON file at :path: param.
+        """Reads and returns the contents of the JSON file at :path: param,
+        which can be gzipped.
         Return type is dict to match the format of the 'newsapi' response object.
 
         Args:
@@ -298,11 +704,10 @@ class Helper:
             A dict of the news data.
 
         Raises:
-            TODO:
+            OSError: If the file can't be read.
+            ValueError: If the file isn't JSON (or gzipped JSON).
         """
-        # TODO: try/catch OSError
-        with open(path, encoding="utf-8") as f:
-            return json.load(f)
+        return helper_extras.read_json_file(path)
 
     def _read_json_file_keys(self, path: str) -> list:
         """Reads and returns the contents of the JSON file at :path: param.
@@ -325,7 +730,7 @@ class Helper:
 def main():
     h = Helper()
     h.set_news_from_newsapi()
-    h.save_news()
+    h.save_news(snapshot=True).result()
 
 
 if __name__ == "__main__":
@@ -1,4 +1,8 @@
+import gzip
+import importlib
 import json
+import os
+import threading
 
 
 LANG_OPTIONS = [
@@ -17,6 +21,79 @@ LANG_OPTIONS = [
     "ud",
     "zh",
 ]
+GZIP_MAGIC = b"\x1f\x8b"
+GZIP_LEVEL = 6  # Most of the size savings of 9 for much less time
+IMPORT_LOCK = threading.RLock()
+
+
+def import_module(name: str):
+    """Imports and returns the module name, one thread at a time.
+    For the slow imports deferred to first use (requests, newsapi, html2text),
+    which fetch threads can reach at the same time: importing requests from two
+    threads at once can leave each with the other's half-initialized modules.
+    """
+    with IMPORT_LOCK:
+        return importlib.import_module(name)
+
+
+def read_json_file(path: str):
+    """Returns the parsed JSON of the file at path, which can be gzipped."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:2] == GZIP_MAGIC:
+        data = gzip.decompress(data)
+    return json.loads(data)
+
+
+def write_json_file(filename: str, data, encoder=None, compress: bool = False) -> None:
+    """Writes data as JSON, gzipped if compress, with write_file.
+
+    Raises:
+        OSError: If the file can't be written. The old file is left as it was.
+    """
+    text = json.dumps(data, ensure_ascii=False, cls=encoder).encode("utf-8")
+    write_file(filename, (compress and gzip.compress(text, GZIP_LEVEL)) or text)
+
+
+def _make_temp_file(filename: str) -> tuple[int, str]:
+    """Makes a new file named after filename, with the mode the umask gives
+    a new file (which tempfile.mkstemp would make private to the user), and
+    returns its file descriptor, open for writing, and its name."""
+    while True:
+        temp_filename = f"{filename}.{os.urandom(4).hex()}.tmp"
+        try:
+            flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+            return os.open(temp_filename, flags, 0o666), temp_filename
+        except FileExistsError:
+            continue
+
+
+def write_file(filename: str, data: bytes) -> None:
+    """Writes data to a temporary file next to filename, then renames it over
+    filename, so filename is always either the old file or the whole new one,
+    even if writing fails part way. The file keeps the old file's mode, or
+    gets the umask's default for a new file.
+
+    Raises:
+        OSError: If the file can't be written. The old file is left as it was.
+    """
+    fd, temp_filename = _make_temp_file(filename)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(temp_filename, os.stat(filename).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass  # A new file keeps the mode it was made with
+        os.replace(temp_filename, filename)
+    except BaseException:
+        try:
+            os.remove(temp_filename)
+        except OSError:
+            pass
+        raise
 
 
 class NewsException(Exception):
@@ -0,0 +1,136 @@
+import array
+import contextlib
+import math
+import os
+import platform
+import sys
+import threading
+import time
+
+
+class LatencyHistogram:
+    """Rolling histogram of the last WINDOW timings of one stage.
+
+    Timings are counted in log-spaced buckets (BUCKETS_PER_DOUBLING per
+    doubling, from MIN_SECS up), so recording one is a log and two counter
+    updates, and percentiles are read off the bucket counts to within a
+    bucket (about 19%). The oldest timing's bucket is decremented as each
+    new one comes in, so the percentiles follow recent behaviour.
+
+    Attributes:
+        counts: List of the timings in the window per bucket.
+        ring: Array of the bucket of each timing in the window, oldest at pos
+            once it's full.
+        pos: Index in ring of the next timing.
+        total: Number of timings recorded, including those out of the window.
+    """
+
+    WINDOW = 1000
+    MIN_SECS = 1e-6  # Timings under a microsecond go in the first bucket
+    BUCKETS_PER_DOUBLING = 4
+    BUCKET_COUNT = 112  # Up to MIN_SECS * 2 ** 28, about 4.5 minutes
+
+    @classmethod
+    def get_bucket(cls, secs: float) -> int:
+        if secs <= cls.MIN_SECS:
+            return 0
+        bucket = int(math.log2(secs / cls.MIN_SECS) * cls.BUCKETS_PER_DOUBLING) + 1
+        return min(bucket, cls.BUCKET_COUNT - 1)
+
+    @classmethod
+    def get_bucket_secs(cls, bucket: int) -> float:
+        """Returns the upper bound of bucket's timings."""
+        return cls.MIN_SECS * 2 ** (bucket / cls.BUCKETS_PER_DOUBLING)
+
+    def __init__(self) -> None:
+        self.counts = [0] * self.BUCKET_COUNT
+        self.ring = array.array("B" if self.BUCKET_COUNT <= 256 else "H")
+        self.pos = 0
+        self.total = 0
+
+    def __len__(self) -> int:
+        return len(self.ring)
+
+    def record(self, secs: float) -> None:
+        bucket = self.get_bucket(secs)
+        self.counts[bucket] += 1
+        self.total += 1
+        if len(self.ring) < self.WINDOW:
+            self.ring.append(bucket)
+        else:
+            old = self.ring[self.pos]
+            self.counts[old] -= 1
+            self.ring[self.pos] = bucket
+            self.pos = (self.pos + 1) % self.WINDOW
+
+    def get_percentile(self, pct: float) -> float:
+        """Returns the upper bound of the bucket the pct percentile falls in,
+        or 0 if there are no timings."""
+        rank = math.ceil(len(self) * pct / 100)
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return self.get_bucket_secs(bucket)
+        return 0.0
+
+    def get_report(self) -> dict:
+        """Returns the count, total count and p50/p95/p99/max in milliseconds."""
+        return {
+            "count": len(self),
+            "total": self.total,
+            "p50_ms": self.get_percentile(50) * 1000,
+            "p95_ms": self.get_percentile(95) * 1000,
+            "p99_ms": self.get_percentile(99) * 1000,
+            "max_ms": self.get_percentile(100) * 1000,
+        }
+
+
+class LatencyStats:
+    """A LatencyHistogram per stage, which any thread can record into.
+
+    Stages are named by what they time, e.g. "article.request" or
+    "headlines.move", and are made when first recorded.
+
+    Attributes:
+        histograms: Dict of stage name to its LatencyHistogram.
+    """
+
+    def __init__(self) -> None:
+        self.histograms: dict[str, LatencyHistogram] = {}
+        self.lock = threading.Lock()
+
+    def record(self, stage: str, secs: float) -> None:
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = LatencyHistogram()
+            histogram.record(secs)
+
+    @contextlib.contextmanager
+    def time(self, stage: str):
+        """Records how long the with block takes, if it doesn't raise."""
+        start = time.perf_counter()
+        yield
+        self.record(stage, time.perf_counter() - start)
+
+    def get_report(self) -> dict:
+        """Returns a dict of stage name to its histogram's report, by name."""
+        with self.lock:
+            return {
+                stage: self.histograms[stage].get_report()
+                for stage in sorted(self.histograms)
+            }
+
+    def get_export(self) -> dict:
+        """Returns the report with what it was measured on, for comparing
+        the numbers from different machines."""
+        return {
+            "machine": {
+                "platform": platform.platform(),
+                "python": sys.version.split()[0],
+                "cpus": os.cpu_count(),
+            },
+            "time": time.time(),
+            "stages": self.get_report(),
+        }
@@ -0,0 +1,205 @@
+import argparse
+import datetime
+import glob
+import json
+import os
+import sqlite3
+import threading
+import helper_extras
+
+
+class NewsArchive:
+    """SQLite archive of newsapi articles, one row per url.
+
+    Adding articles that are already archived does nothing, so the same
+    response can be archived any number of times. The publishedAt, source
+    and language columns are indexed (each along with publishedAt), so a
+    window of them, e.g. the last 24 hours from a few sources, is read
+    without going through the rest of the archive.
+
+    Attributes:
+        path: String of the path to the database file.
+        connection: sqlite3 Connection to the database, shared by all threads.
+        DEFAULT_PATH: Default database file, in the HOME directory.
+        TIME_FORMAT: The strftime format of newsapi publishedAt values.
+    """
+
+    DEFAULT_PATH = os.path.join(os.getenv("HOME", ""), "news_archive.db")
+    TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS articles (
+            url TEXT PRIMARY KEY,
+            published_at TEXT NOT NULL DEFAULT '',
+            source TEXT NOT NULL DEFAULT '',
+            source_id TEXT NOT NULL DEFAULT '',
+            lang TEXT NOT NULL DEFAULT '',
+            archived_at TEXT NOT NULL,
+            article TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS articles_published_at ON articles (published_at);
+        CREATE INDEX IF NOT EXISTS articles_source ON articles (source, published_at);
+        CREATE INDEX IF NOT EXISTS articles_source_id
+            ON articles (source_id, published_at);
+        CREATE INDEX IF NOT EXISTS articles_lang ON articles (lang, published_at);
+    """
+
+    @classmethod
+    def _get_time(cls, hours_ago: float = 0) -> str:
+        """Returns the UTC time hours_ago hours ago in the publishedAt format."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        return (now - datetime.timedelta(hours=hours_ago)).strftime(cls.TIME_FORMAT)
+
+    def __init__(self, path: str = DEFAULT_PATH) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.executescript(self.SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __len__(self) -> int:
+        with self.lock:
+            row = self.connection.execute("SELECT COUNT(*) FROM articles").fetchone()
+        return row[0]
+
+    def add_articles(self, articles: list[dict], lang: str | None = None) -> int:
+        """Archives the newsapi articles whose urls aren't archived yet,
+        in one transaction, and returns how many that was.
+
+        Args:
+            articles: List of newsapi article dicts. Ones without a url are skipped.
+            lang: The 2-letter language code the articles were fetched in,
+                if known (newsapi articles don't say).
+        """
+        archived_at = self._get_time()
+        rows = [
+            (
+                a["url"],
+                a.get("publishedAt") or "",
+                (a.get("source") or {}).get("name") or "",
+                (a.get("source") or {}).get("id") or "",
+                lang or "",
+                archived_at,
+                json.dumps(a, ensure_ascii=False),
+            )
+            for a in articles
+            if type(a) is dict and a.get("url")
+        ]
+        with self.lock, self.connection:
+            changes = self.connection.total_changes
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            return self.connection.total_changes - changes
+
+    def import_files(self, paths: list[str], lang: str | None = None) -> int:
+        """Archives the articles of the saved newsapi responses at paths
+        (e.g. news_sample*.json, gzipped or not) and returns how many were new.
+        Files that can't be read or aren't responses are skipped."""
+        added = 0
+        for path in paths:
+            try:
+                response = helper_extras.read_json_file(path)
+            except (OSError, ValueError):
+                continue
+            articles = type(response) is dict and response.get("articles")
+            if type(articles) is list:
+                added += self.add_articles(articles, lang)
+        return added
+
+    def get_articles(
+        self,
+        hours: float | None = None,
+        sources: list[str] | None = None,
+        lang: str | None = None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        """Returns the archived articles in a window, newest first.
+
+        Args:
+            hours: Only articles published in the last this many hours.
+            sources: Only articles from these sources (names or newsapi ids).
+            lang: Only articles archived with this language code.
+            limit: At most this many articles.
+        """
+        where = []
+        params: list = []
+        if hours is not None:
+            where.append("published_at >= ?")
+            params.append(self._get_time(hours))
+        if sources:
+            marks = ", ".join("?" * len(sources))
+            where.append(f"(source IN ({marks}) OR source_id IN ({marks}))")
+            params += list(sources) * 2
+        if lang:
+            where.append("lang = ?")
+            params.append(lang)
+        sql = "SELECT article FROM articles"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY published_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self.lock:
+            rows = self.connection.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get_response(self, **kwargs) -> dict:
+        """Returns the articles of get_articles(**kwargs)
+        as a newsapi response object."""
+        articles = self.get_articles(**kwargs)
+        return {"status": "ok", "totalResults": len(articles), "articles": articles}
+
+    def get_stats(self) -> dict:
+        """Returns the article count, the publishedAt range, and the
+        article count per language and of the ten biggest sources."""
+        with self.lock:
+            count, oldest, newest = self.connection.execute(
+                "SELECT COUNT(*), MIN(published_at), MAX(published_at) FROM articles"
+            ).fetchone()
+            langs = self.connection.execute(
+                "SELECT lang, COUNT(*) FROM articles GROUP BY lang"
+            ).fetchall()
+            sources = self.connection.execute(
+                "SELECT source, COUNT(*) AS n FROM articles"
+                " GROUP BY source ORDER BY n DESC LIMIT 10"
+            ).fetchall()
+        return {
+            "articles": count,
+            "oldest": oldest,
+            "newest": newest,
+            "langs": dict(langs),
+            "sources": dict(sources),
+        }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Manage the headline archive.")
+    arg_parser.add_argument("--path", default=NewsArchive.DEFAULT_PATH)
+    subparsers = arg_parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser(
+        "import", help="Archive saved newsapi responses"
+    )
+    import_parser.add_argument(
+        "files",
+        nargs="*",
+        help="Default: the news_sample*.json files in the HOME directory",
+    )
+    import_parser.add_argument("--lang", help="Language the files were fetched in")
+    subparsers.add_parser("stats", help="Show what's archived")
+    args = arg_parser.parse_args()
+    archive = NewsArchive(args.path)
+    if args.command == "import":
+        pattern = os.path.join(os.getenv("HOME", ""), "news_sample*.json")
+        files = args.files or sorted(glob.glob(pattern) + glob.glob(pattern + ".gz"))
+        added = archive.import_files(files, args.lang)
+        print(f"Archived {added} new articles from {len(files)} files")
+    print(json.dumps(archive.get_stats(), indent=2, ensure_ascii=False))
+    archive.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,35 @@
+from __future__ import annotations
+import time
+
+IMPORT_START = time.perf_counter()  # For the startup report
+
+import argparse
 import helper
 import headlines_win
 import article_win
 import commands
+import concurrent.futures
 import curses
+import functools
+import os
+import article_prefetcher
+import article
+import article_cache
+import session_pool
+import fetch_engine
+import article_mem_cache
+import article_extractor
+import news_win
+import screen_renderer
+import search_index
+import latency_stats
+import stats_overlay
+import typing
+
+if typing.TYPE_CHECKING:
+    import session_profiler
+
+IMPORT_SECS = time.perf_counter() - IMPORT_START
 
 
 class NewsReader:
@@ -12,19 +39,85 @@ class NewsReader:
 
     """
 
-    def __init__(self, use_saved=False) -> None:
-        self.helper = helper.Helper(use_saved=use_saved)
+    POLL_MS = 50  # How long each input poll waits before checking on fetches
+    REFRESH_SECS = 600  # Default time between background headline refreshes
+    STARTUP_BUDGET_SECS = 0.5  # Default most seconds from import to first paint
+    RESIZE_DEBOUNCE_SECS = 0.15  # Quiet time after a resize before relaying out
+
+    def __init__(
+        self,
+        use_saved=False,
+        prefetch_window: int = article_prefetcher.ArticlePrefetcher.WINDOW,
+        fetch_workers: int = fetch_engine.FetchEngine.WORKERS,
+        host_limit: int = fetch_engine.FetchEngine.HOST_LIMIT,
+        cache_max_bytes: int = article_cache.ArticleCache.MAX_BYTES,
+        pool_size: int = session_pool.SessionPool.POOL_SIZE,
+        streaming: bool = True,
+        mem_cache_max_bytes: int = article_mem_cache.ArticleMemCache.MAX_BYTES,
+        extractor_name: str = "",
+        refresh_secs: float = REFRESH_SECS,
+        response_ttl: float = helper.Helper.RESPONSE_TTL,
+        base_url: str = "",
+        archive_window: dict | None = None,
+        startup_budget: float = STARTUP_BUDGET_SECS,
+        use_snapshot: bool = False,
+        profile: bool = False,
+    ) -> None:
+        self.sessions = session_pool.SessionPool(pool_size, base_url=base_url)
+        self.helper = helper.Helper(
+            use_saved=use_saved, sessions=self.sessions, response_ttl=response_ttl
+        )
         self.use_saved = use_saved
+        self.use_snapshot = use_snapshot  # Map the saved snapshot if there is one
+        self.archive_window = archive_window  # get_news_from_archive kwargs
+        self.prefetch_window = prefetch_window
+        self.fetch_workers = fetch_workers
+        self.host_limit = host_limit
+        self.mem_cache_max_bytes = mem_cache_max_bytes
+        self.refresh_secs = refresh_secs  # 0 turns the background refresh off
+        self.news_kwargs: dict = {}
+        self.refresh: concurrent.futures.Future | None = None
+        self.last_refresh_time = time.monotonic()
+        self.search_index: search_index.SearchIndex | None = None
+        self.search_results: list[str] = []  # Urls of the last search's results
+        self.search_pos = 0  # Position in search_results of the shown result
+        self.search_query = ""
+        self.search_ms = 0.0  # How long the last search took
+        self.search_build: concurrent.futures.Future | None = None
+        self.renderer: screen_renderer.ScreenRenderer | None = None
+        self.search_backlog: list[dict] = []  # Headlines merged before it's built
+        self.saving: concurrent.futures.Future | None = None  # Archiving headlines
+        self.startup_budget = startup_budget
+        self.startup: dict = {"import": IMPORT_SECS}  # See get_startup_report
+        self.latency = latency_stats.LatencyStats()  # See save_latency_stats
+        self.profile = profile  # Profile all of news_main (see toggle_profiling)
+        self.profiler: session_profiler.SessionProfiler | None = None  # start_profiler
+        self.profile_count = 0  # Profiles saved with the profiling key
+        self.key_stats = {"move_keys": 0, "moves": 0, "merged_keys": 0}
+        self.resize_due = 0.0  # time.monotonic to relay out at, or 0
+        self.is_too_small = False  # Whether the terminal is too small to draw in
+        self.resize_stats = {"events": 0, "layouts": 0}
+        article.Article.disk_cache = article_cache.ArticleCache(
+            self.helper.cache_path_base, cache_max_bytes
+        )
+        article.Article.sessions = self.sessions
+        article.Article.streaming = streaming
+        article.Article.extractor = article_extractor.get_extractor(extractor_name)
+        article.Article.latency = news_win.NewsWin.latency = self.latency
 
     def set_news_data(self, **kwargs) -> None:
         """Set the helper attribute 'news_data' to the saved or fetched data. 
 
         Locally-saved or fetched-from-online data is used based on whether the
         'use_saved' parameter was set to True when the NewsReader object was created.
+        If the 'archive_window' parameter was set instead, the archived headlines
+        in that window are used (see Helper.get_news_from_archive).
+        With 'use_snapshot' as well as 'use_saved', the saved snapshot is used
+        if there is one (see Helper.set_news_from_snapshot).
 
         Kwargs are only needed if the user wishes to override the default fetching behavior 
         of 20 top current headlines in English. 
-        Kwargs are only used if 'use_saved' is False.
+        Kwargs are only used if 'use_saved' is False and 'archive_window' is None.
 
         Kwargs:
             top: Boolean to choose "top headlines" or "everything" endpoint.
@@ -32,6 +125,7 @@ class NewsReader:
             query: String to search for articles (only used if top is False).
             prev_days: Number of days before today to get news from. Default: 0.
             sort_pop: Boolean to sort results by popularity or relevance (if top False).
+            specs: List of dicts of the above kwargs to fetch concurrently and merge.
 
         Raises:
             NewsKeysException: If self._set_news_key_choice() fails.
@@ -45,38 +139,431 @@ class NewsReader:
         """
         # And/or explain the params in a separate 'run_me.py' file?
         # Keep full helper docstring or put something like 'see NewsReader.set_news_data docstring'?
-        if self.use_saved:
-            self.helper.set_news_from_newsapi_file(1)
+        start = time.perf_counter()
+        self.news_kwargs = kwargs
+        if self.archive_window is not None:
+            self.helper.set_news_from_archive(**self.archive_window)
+        elif self.use_saved:
+            snapshot_filename = self.helper.get_snapshot_filename(1)
+            if self.use_snapshot and os.path.exists(snapshot_filename):
+                self.helper.set_news_from_snapshot(1)
+            else:
+                self.helper.set_news_from_newsapi_file(1)
         else:
             self.helper.set_news_from_newsapi(**kwargs)
+        self.startup["fetch"] = time.perf_counter() - start
+        self.startup["headlines_from"] = self.helper.news_source
 
-    def curses_setup(self) -> None:
+    def start_refresh(self, max_age: float | None = None) -> None:
+        """Starts fetching the latest headlines in the background, the same way
+        set_news_data got the current ones, unless a refresh is already running.
+        Cached responses up to max_age seconds old are used
+        (see Helper.get_news_from_newsapi).
+        """
+        if self.refresh and not self.refresh.done():
+            return
+        self.last_refresh_time = time.monotonic()
+        if self.archive_window is not None:
+            fetch = functools.partial(
+                self.helper.get_news_from_archive, **self.archive_window
+            )
+            url = self.helper.archive_path
+        elif self.use_saved:
+            fetch = functools.partial(self.helper.get_news_from_newsapi_file, 1)
+            url = self.helper.news_path_base
+        else:
+            fetch = functools.partial(
+                self.helper.get_news_from_newsapi, max_age, **self.news_kwargs
+            )
+            url = helper.Helper.NEWSAPI_URL
+        self.refresh = self.engine.submit(url, fetch)
+
+    def poll_refresh(self) -> None:
+        """Merges the refreshed headlines once they land, starting a
+        background refresh first if one is due."""
+        if (
+            self.refresh_secs
+            and time.monotonic() - self.last_refresh_time >= self.refresh_secs
+        ):
+            # A response cached before the last refresh has nothing new in it
+            self.start_refresh(max_age=min(self.refresh_secs, self.helper.response_ttl))
+        if not (self.refresh and self.refresh.done()):
+            return
+        refresh, self.refresh = self.refresh, None
+        if refresh.exception():
+            return
+        response = refresh.result()
+        articles = (type(response) is dict and response.get("articles")) or []
+        if "fresh" not in self.startup:
+            self.startup["fresh"] = time.perf_counter() - IMPORT_START
+        if self.helper._is_list_of_dicts(articles):
+            new_articles = self.headlines_win.merge_headlines(articles)
+            self.helper.add_news_data(new_articles)
+            if self.search_index is not None:
+                for a in new_articles:
+                    self.search_index.add_headline(a)
+            else:
+                self.search_backlog += new_articles
+
+    def build_search_index(self, data: list[dict]) -> search_index.SearchIndex:
+        """Returns a search index of the headlines in data
+        and of their article text in the disk cache."""
+        index = search_index.SearchIndex()
+        disk_cache = article.Article.disk_cache
+        variant = article.Article.get_txt_variant()
+        for a in data:
+            index.add_headline(a)
+            txt = disk_cache and disk_cache.get_txt(a.get("url") or "", variant)
+            if txt:
+                index.add_body(a["url"], txt)
+        return index
+
+    def get_search_index(self) -> search_index.SearchIndex:
+        """Returns the search index once it's built (waiting for it if needed),
+        adding the text of any articles loaded since the last time."""
+        if self.search_index is None:
+            if not self.search_build.done():
+                self.print_status("Indexing...")
+                self.renderer.commit()
+            self.search_index = self.search_build.result()
+            for a in self.search_backlog:
+                self.search_index.add_headline(a)
+            self.search_backlog = []
+        for url, txt in self.prefetcher.get_loaded_txts(
+            self.search_index.body_urls
+        ).items():
+            self.search_index.add_body(url, txt)
+        return self.search_index
+
+    def get_news_lang(self) -> str | None:
+        """Returns the language the headlines were fetched in,
+        if it's known and they were all fetched in the same one."""
+        if self.archive_window is not None:
+            return self.archive_window.get("lang")
+        if self.use_saved:
+            return None
+        return self.helper.get_newsapi_lang(**self.news_kwargs)
+
+    def get_startup_report(self) -> dict:
+        """Returns the seconds startup took, by stage:
+        import: Importing news_reader and the modules it needs up front.
+        fetch: set_news_data getting the headlines (headlines_from says where from).
+        first_paint: news_main drawing the windows the first time.
+        total: From the start of the import to the first paint.
+        fresh: From the start of the import until the first refresh landed,
+            if there was one (e.g. the headlines painted first were stale).
+        Plus the budget for total and whether total went over it.
+        """
+        total = self.startup.get("total", 0.0)
+        return dict(
+            self.startup,
+            budget=self.startup_budget,
+            is_over_budget=total > self.startup_budget,
+        )
+
+    def save_headlines(self) -> None:
+        """Starts adding the headlines to the archive in the background.
+        poll_save says how it went."""
+        self.saving = self.helper.archive_news(self.get_news_lang())
+        self.print_status("Archiving headlines...")
+
+    def poll_save(self) -> None:
+        """Says how many headlines were newly archived once archiving is done."""
+        if not (self.saving and self.saving.done()):
+            return
+        saving, self.saving = self.saving, None
+        if saving.exception():
+            self.print_status(f"Archiving failed: {saving.exception()}")
+        else:
+            self.print_status(
+                f"Archived {saving.result()} new headlines"
+                f" ({len(self.helper.get_archive())} in the archive)"
+            )
+
+    def save_latency_stats(self) -> None:
+        """Saves the latency percentiles of each stage, with what machine
+        they're from and the timings of the last newsapi fan-out, to the
+        debug file with the "_latency" suffix."""
+        export = self.latency.get_export()
+        export["fetch_timings"] = self.helper.fetch_timings
+        try:
+            self.helper.save_debug_json(export, "_latency")
+        except OSError as e:
+            self.print_status(f"Saving latency stats failed: {e}")
+            return
+        self.print_status(
+            "Saved latency stats to "
+            + self.helper._get_json_filename(self.helper.debug_path_base, "_latency")
+        )
+
+    def toggle_stats_overlay(self) -> None:
+        """Shows or hides the latency stats over the article window."""
+        if not self.stats_overlay.is_shown:
+            self.stats_overlay.show(self.article_win.get_START_X())
+            return
+        self.stats_overlay.hide()
+        self.article_win.win.touchwin()
+        self.article_win.pad.touchwin()
+        self.article_win.refresh_win()
+
+    def save_profile(self, path_counter: int | str) -> str | None:
+        """Stops the profiler and saves its stats with the path_counter suffix
+        (see Helper.save_debug_profile).
+
+        Returns:
+            The filename of the stats, or None if there were none or they
+            couldn't be saved.
+        """
+        result = self.profiler.stop()
+        if result is None:
+            return None
+        stats, secs = result
+        try:
+            return self.helper.save_debug_profile(
+                stats, self.profiler.get_txt(stats, secs), path_counter
+            )
+        except OSError as e:
+            if self.renderer:  # Not if the app quit before it started drawing
+                self.print_status(f"Saving the profile failed: {e}")
+            return None
+
+    def start_profiler(self) -> None:
+        """Starts the profiler, making it first if need be, so cProfile and
+        pstats are only imported when profiling."""
+        if self.profiler is None:
+            import session_profiler
+
+            self.profiler = session_profiler.SessionProfiler()
+        self.profiler.start()
+
+    def toggle_profiling(self) -> None:
+        """Starts profiling, or stops and saves the profile to the debug files
+        with the "_profile<n>" suffix, e.g. around loading one article."""
+        if self.profile:
+            self.print_status("Already profiling the whole session (--profile)")
+        elif not (self.profiler and self.profiler.is_running):
+            self.print_status("Profiling... (p again to stop)")
+            self.start_profiler()
+            self.engine.profiler = self.profiler
+        else:
+            self.profile_count += 1
+            filename = self.save_profile(f"_profile{self.profile_count}")
+            if filename:
+                self.print_status(f"Saved profile to {filename}")
+
+    def read_move_run(self, cmd: int) -> tuple[int, int]:
+        """Reads the keys already queued after cmd, a scrolling command, while
+        they scroll the same window, so a held key makes one move of the net
+        increment instead of repainting for each key. The first other key is
+        put back to be read next.
+
+        Returns:
+            The net increment of the keys (see Commands.get_move_incr)
+            and how many keys were read.
+        """
+        group = commands.Commands.get_move_group(cmd)
+        page_len = len(article_win.ArticleWin.get_LINE_RANGE())
+        incr = commands.Commands.get_move_incr(cmd, page_len)
+        key_count = 1
+        self.screen.timeout(0)
+        try:
+            while True:
+                next_cmd = self.screen.getch()
+                if next_cmd == -1:
+                    break
+                if commands.Commands.get_move_group(next_cmd) != group:
+                    curses.ungetch(next_cmd)
+                    break
+                incr += commands.Commands.get_move_incr(next_cmd, page_len)
+                key_count += 1
+        finally:
+            self.screen.timeout(self.POLL_MS)
+        self.key_stats["move_keys"] += key_count
+        self.key_stats["moves"] += 1
+        self.key_stats["merged_keys"] += key_count - 1
+        if key_count > 1:
+            self.print_status(f"{incr:+} {group} ({key_count} keys merged)")
+        return incr, key_count
+
+    def print_too_small(self) -> None:
+        """Clears the screen and says how big the terminal needs to be."""
+        lines, cols = news_win.NewsWin.get_min_size()
+        curses.update_lines_cols()
+        self.screen.erase()
+        self.screen.addstr(
+            0, 0, f"Terminal too small, needs {cols}x{lines}"[: curses.COLS - 1]
+        )
+        self.screen.refresh()
+
+    def wait_for_room(self) -> bool:
+        """Sizes the windows to the terminal, first waiting until it's big
+        enough if it isn't. Returns False if the user quit while waiting."""
+        while not news_win.NewsWin.set_size(*self.screen.getmaxyx()):
+            self.print_too_small()
+            cmd = self.screen.getch()
+            if cmd == commands.Commands.QUIT:
+                return False
+        return True
+
+    def schedule_layout(self) -> None:
+        """Lays the windows out again once the terminal has been the same
+        size for RESIZE_DEBOUNCE_SECS, so dragging a window edge, which sends
+        a stream of resizes, only relays out once it stops."""
+        self.resize_stats["events"] += 1
+        self.resize_due = time.monotonic() + self.RESIZE_DEBOUNCE_SECS
+
+    def layout(self) -> None:
+        """Sizes the windows to the terminal and draws them again,
+        reflowing the article to the new width, or says the terminal's too
+        small (leaving the windows as they were until it's bigger)."""
+        self.resize_due = 0.0
+        self.resize_stats["layouts"] += 1
+        curses.update_lines_cols()
+        self.renderer.forget_all()
+        self.is_too_small = not news_win.NewsWin.set_size(*self.screen.getmaxyx())
+        if self.is_too_small:
+            self.print_too_small()
+            return
         self.screen.clear()
-        curses.use_default_colors()
-        curses.init_pair(2, 196, -1)
-        curses.init_pair(3, 27, -1)
-        curses.curs_set(0)
+        self.headlines_win.resize()
+        self.article_win.resize()
+        self.paint_windows()
+        if self.stats_overlay.is_shown:
+            self.stats_overlay.hide()
+            self.stats_overlay.show(self.article_win.get_START_X())
 
-    def news_main(self, stdscr: curses.window) -> None:
-        self.screen = stdscr
-        self.curses_setup()
-        self.headlines_win = headlines_win.HeadlinesWin(self.helper.get_news_data())
+    def paint_windows(self) -> None:
         self.headlines_win.print_win_name("Headlines")
         self.headlines_win.new_init_blocks()
         self.headlines_win.print_box()
         self.screen.refresh()
         self.headlines_win.refresh_win()
-        self.article_win = article_win.ArticleWin()
         self.article_win.print_win_name("Article")
         self.article_win.print_box()
         self.article_win.refresh_win()
+
+    def get_status_ypos(self) -> int:
+        return min(news_win.NewsWin.HEIGHT, curses.LINES - 1)
+
+    def print_status(self, msg: str) -> None:
+        """Shows msg on the status line below the windows."""
+        width = curses.COLS - 1
+        news_win.NewsWin.put_str(
+            self.screen, self.get_status_ypos(), 0, msg[:width].ljust(width)
+        )
+        self.renderer.stage(self.screen)
+
+    def search(self) -> None:
+        """Prompts for a query on the status line and jumps to the best match."""
+        self.print_status("/")
+        self.renderer.commit()
+        curses.echo()
+        curses.curs_set(1)
+        self.screen.timeout(-1)
+        try:
+            query = self.screen.getstr(self.get_status_ypos(), 1).decode(
+                "utf-8", errors="replace"
+            )
+        finally:
+            self.screen.timeout(self.POLL_MS)
+            curses.curs_set(0)
+            curses.noecho()
+            self.renderer.forget(self.screen)
+        start = time.perf_counter()
+        self.search_results = self.get_search_index().search(query)
+        self.search_query = query
+        self.search_ms = (time.perf_counter() - start) * 1000
+        self.search_pos = 0
+        self.show_search_result()
+
+    def show_search_result(self, step: int = 0) -> None:
+        """Selects the search result step results after the shown one
+        (wrapping around) and says which it is on the status line."""
+        if not self.search_results:
+            self.print_status(f'No matches for "{self.search_query}"')
+            return
+        self.search_pos = (self.search_pos + step) % len(self.search_results)
+        idx = self.headlines_win.headline_blocks.get_idx_of_url(
+            self.search_results[self.search_pos]
+        )
+        if idx >= 0:
+            self.headlines_win.select_idx(idx)
+        self.print_status(
+            f"{self.search_pos + 1} of {len(self.search_results)} matches for "
+            f'"{self.search_query}" ({self.search_ms:.1f} ms), n/N for next/previous'
+        )
+
+    def curses_setup(self) -> None:
+        self.screen.clear()
+        curses.use_default_colors()
+        curses.init_pair(2, 196, -1)
+        curses.init_pair(3, 27, -1)
+        curses.curs_set(0)
+
+    def news_main(self, stdscr: curses.window) -> dict:
+        """Runs the app in stdscr until the user quits and returns its stats,
+        profiling all of it, however it ends, if self.profile. A profile
+        started with the profiling key is saved too if it's still running."""
+        if self.profile:
+            self.start_profiler()
+        try:
+            return self.run_main(stdscr)
+        finally:
+            if self.profile:
+                self.save_profile("_profile")
+            elif self.profiler and self.profiler.is_running:
+                self.profile_count += 1
+                self.save_profile(f"_profile{self.profile_count}")
+
+    def run_main(self, stdscr: curses.window) -> dict:
+        self.screen = stdscr
+        main_start = time.perf_counter()
+        self.curses_setup()
+        if not self.wait_for_room():
+            return {"startup": self.get_startup_report()}
+        self.renderer = screen_renderer.ScreenRenderer()
+        news_win.NewsWin.renderer = self.renderer
+        self.engine = fetch_engine.FetchEngine(self.fetch_workers, self.host_limit)
+        self.engine.profiler = self.profiler
+        if self.helper.is_news_stale:
+            self.start_refresh()
+        self.prefetcher = article_prefetcher.ArticlePrefetcher(
+            self.engine,
+            article_mem_cache.ArticleMemCache(self.mem_cache_max_bytes),
+            self.prefetch_window,
+        )
+        self.headlines_win = headlines_win.HeadlinesWin(
+            self.helper.get_news_data(), self.prefetcher
+        )
+        self.article_win = article_win.ArticleWin(self.prefetcher)
+        self.paint_windows()
+        self.renderer.commit()
+        self.startup["first_paint"] = time.perf_counter() - main_start
+        self.startup["total"] = time.perf_counter() - IMPORT_START
+        self.stats_overlay = stats_overlay.StatsOverlay(self.latency)
+        self.search_build = self.engine.submit(
+            "", self.build_search_index, self.helper.get_news_data().copy()
+        )
+        self.screen.timeout(self.POLL_MS)
         while True:
             cmd = self.screen.getch()
-            if cmd in [
-                commands.Commands.HEADLINES_DOWN,
-                commands.Commands.HEADLINES_UP,
-            ]:
-                self.headlines_win.new_move_vert(cmd)
+            if cmd == curses.KEY_RESIZE:
+                self.schedule_layout()
+                continue
+            if self.resize_due:
+                # Another key lays out straight away, so it acts on the new layout
+                if cmd == -1 and time.monotonic() < self.resize_due:
+                    continue
+                self.layout()
+            if self.is_too_small and cmd != commands.Commands.QUIT:
+                self.renderer.commit()
+                continue
+            self.article_win.poll_article()
+            self.poll_refresh()
+            self.poll_save()
+            self.stats_overlay.poll(time.monotonic())
+            if commands.Commands.get_move_group(cmd) == "headlines":
+                self.headlines_win.move_vert_by(self.read_move_run(cmd)[0])
             elif cmd in [
                 commands.Commands.MAIN_LINE_LEFT,
                 commands.Commands.MAIN_LINE_RIGHT,
@@ -92,7 +579,12 @@ class NewsReader:
                     self.headlines_win.headline_blocks.get_selection_blk()
                 )
                 self.article_win.load_page(selected_headline)
-            elif cmd in [commands.Commands.ARTICLE_DOWN, commands.Commands.ARTICLE_UP]:
+            elif commands.Commands.get_move_group(cmd) == "article lines":
+                self.article_win.move_vert_by(self.read_move_run(cmd)[0])
+            elif cmd in [
+                commands.Commands.ARTICLE_TOP,
+                commands.Commands.ARTICLE_BOTTOM,
+            ]:
                 self.article_win.move_vert(cmd)
             elif cmd in [
                 commands.Commands.OPEN_BROWSER,
@@ -103,14 +595,63 @@ class NewsReader:
                     commands.Commands.get_browser_prefix_choice(cmd)
                 )
             elif cmd == commands.Commands.SAVE_HEADLINES:
-                self.helper.save_news(1)
+                self.save_headlines()
+            elif cmd == commands.Commands.REFRESH_HEADLINES:
+                self.start_refresh(max_age=0)
+            elif cmd == commands.Commands.SEARCH:
+                self.search()
+            elif (
+                cmd in [commands.Commands.SEARCH_NEXT, commands.Commands.SEARCH_PREV]
+                and self.search_results
+            ):
+                self.show_search_result(
+                    (cmd == commands.Commands.SEARCH_NEXT and 1) or -1
+                )
+            elif cmd == commands.Commands.STATS_OVERLAY:
+                self.toggle_stats_overlay()
+            elif cmd == commands.Commands.SAVE_STATS:
+                self.save_latency_stats()
+            elif cmd == commands.Commands.PROFILE:
+                self.toggle_profiling()
             elif cmd == commands.Commands.QUIT:
                 # TODO: Add save_news logic here? If not use_saved
+                self.engine.shutdown()
+                self.helper.saver.shutdown()  # Finishes any saves first
+                article.Article.disk_cache.flush()
+                session_stats = self.sessions.get_stats()  # close forgets them
+                self.sessions.close()
                 break
+            if self.renderer.is_pending:
+                self.stats_overlay.keep_on_top()
+                with self.latency.time("screen.update"):
+                    self.renderer.commit()
+        return {
+            "render": self.renderer.get_stats(),
+            "latency": self.latency.get_report(),
+            "keys": self.key_stats,
+            "resize": self.resize_stats,
+            "headlines": self.headlines_win.headline_blocks.get_memory_stats(),
+            "sessions": session_stats,
+            "fetch_timings": self.helper.fetch_timings,
+            "saves": self.helper.saver.get_stats(),
+            "startup": self.get_startup_report(),
+        }
 
 
-if __name__ == "__main__":
-    nr = NewsReader()
+def main():
+    arg_parser = argparse.ArgumentParser(description="Read the news in the terminal.")
+    arg_parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile the whole session, saving the stats to ~/news_debug_profile.prof "
+        "(and a summary to ~/news_debug_profile.txt) on quit",
+    )
+    args = arg_parser.parse_args()
+    nr = NewsReader(profile=args.profile)
     nr.set_news_data()
     a = curses.wrapper(nr.news_main)
     print(a)
+
+
+if __name__ == "__main__":
+    main()
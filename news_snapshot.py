@@ -0,0 +1,216 @@
+import argparse
+import array
+import collections.abc
+import mmap
+import struct
+import sys
+import helper_extras
+
+
+class SnapshotFile:
+    """Memory-mapped binary snapshot of a list of newsapi articles, read one
+    field of one article at a time, so opening it costs the same however many
+    articles it has and reading the visible headlines doesn't parse the rest.
+
+    File layout (little-endian):
+        Header: MAGIC, then the article count and field count as uint32s.
+        Offset table: for each of FIELDS in turn, for each article, the
+            uint32 start and length of the field's UTF-8 text in the blob
+            (length NULL for None). Fields are stored column by column, like
+            HeadlineStore, so a column's entries are next to each other.
+        Blob: the UTF-8 text of every field, one after the other.
+
+    Only the fields in FIELDS are kept (the source is kept as its id and name).
+
+    Attributes:
+        count: Number of articles in the snapshot.
+        mmap: The mmap of the file.
+        table: uint32 memoryview (or array) of the offset table.
+        blob: memoryview of the text blob.
+        FIELDS: The newsapi article fields stored, in order.
+    """
+
+    MAGIC = b"NEWSSNP1"
+    HEADER = struct.Struct("<8sII")
+    NULL = 0xFFFFFFFF
+    FIELDS = (
+        "source.id",
+        "source.name",
+        "author",
+        "title",
+        "description",
+        "url",
+        "urlToImage",
+        "publishedAt",
+        "content",
+    )
+    FIELD_IDXS = {field: i for i, field in enumerate(FIELDS)}
+
+    @classmethod
+    def _get_value(cls, article: dict, field: str) -> str | None:
+        if field.startswith("source."):
+            source = article.get("source")
+            if type(source) is not dict:
+                return None
+            value = source.get(field[7:])
+        else:
+            value = article.get(field)
+        if value is None:
+            return None
+        return str(value)
+
+    @classmethod
+    def get_bytes(cls, articles: list[dict]) -> bytes:
+        """Returns the snapshot of articles.
+
+        Raises:
+            ValueError: If the text of the articles is over 4 GiB.
+        """
+        table = array.array("I")
+        blob = bytearray()
+        for field in cls.FIELDS:
+            for article in articles:
+                value = cls._get_value(article, field)
+                if value is None:
+                    table.extend((0, cls.NULL))
+                    continue
+                data = value.encode("utf-8")
+                table.extend((len(blob), len(data)))
+                blob += data
+        if len(blob) >= cls.NULL:
+            raise ValueError("snapshot text must be under 4 GiB")
+        if sys.byteorder == "big":
+            table.byteswap()
+        header = cls.HEADER.pack(cls.MAGIC, len(articles), len(cls.FIELDS))
+        return header + table.tobytes() + blob
+
+    @classmethod
+    def write(cls, filename: str, articles: list[dict]) -> None:
+        """Writes the snapshot of articles to filename atomically.
+
+        Raises:
+            OSError: If the file can't be written. The old file is left as it was.
+            ValueError: If the text of the articles is over 4 GiB.
+        """
+        helper_extras.write_file(filename, cls.get_bytes(articles))
+
+    def __init__(self, filename: str) -> None:
+        """Maps the snapshot at filename.
+
+        Raises:
+            OSError: If the file can't be opened.
+            ValueError: If it isn't a snapshot (or is truncated).
+        """
+        with open(filename, "rb") as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, field_count = self.HEADER.unpack_from(
+            self.mmap.read(self.HEADER.size).ljust(self.HEADER.size, b"\0")
+        )
+        table_end = self.HEADER.size + self.count * len(self.FIELDS) * 8
+        if magic != self.MAGIC or field_count != len(self.FIELDS):
+            self.mmap.close()
+            raise ValueError(f"{filename} is not a news snapshot")
+        if len(self.mmap) < table_end:
+            self.mmap.close()
+            raise ValueError(f"{filename} is truncated")
+        view = memoryview(self.mmap)
+        self.table = view[self.HEADER.size : table_end].cast("I")
+        if sys.byteorder == "big":
+            self.table = array.array("I", self.table)
+            self.table.byteswap()
+        self.blob = view[table_end:]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def get_field(self, field: str, idx: int) -> str | None:
+        """Returns the field (one of FIELDS) of the article at idx."""
+        if not 0 <= idx < self.count:
+            raise IndexError("snapshot index out of range")
+        entry = 2 * (self.FIELD_IDXS[field] * self.count + idx)
+        length = self.table[entry + 1]
+        if length == self.NULL:
+            return None
+        start = self.table[entry]
+        return str(self.blob[start : start + length], "utf-8")
+
+    def get_article(self, idx: int) -> dict:
+        """Returns the article at idx as a newsapi article dict."""
+        article = {
+            field: self.get_field(field, idx)
+            for field in self.FIELDS
+            if not field.startswith("source.")
+        }
+        article["source"] = {
+            "id": self.get_field("source.id", idx),
+            "name": self.get_field("source.name", idx),
+        }
+        return article
+
+    def get_column(self, field: str) -> list[str | None]:
+        """Returns the field of every article, without making their dicts."""
+        return [self.get_field(field, idx) for idx in range(self.count)]
+
+    def close(self) -> None:
+        if isinstance(self.table, memoryview):
+            self.table.release()
+        self.blob.release()
+        self.mmap.close()
+
+
+class SnapshotArticles(collections.abc.Sequence):
+    """The articles of a SnapshotFile as a sequence of newsapi article dicts,
+    made when they're read, after any articles inserted in front of them
+    (e.g. by a refresh), which are kept in a list.
+
+    Attributes:
+        file: The SnapshotFile.
+        front: List of the article dicts inserted in front of the file's.
+    """
+
+    def __init__(self, file: SnapshotFile, front: list[dict] | None = None) -> None:
+        self.file = file
+        self.front = front or []
+
+    def __len__(self) -> int:
+        return len(self.front) + len(self.file)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("snapshot index out of range")
+        if idx < len(self.front):
+            return self.front[idx]
+        return self.file.get_article(idx - len(self.front))
+
+    def insert_front(self, articles: list[dict]) -> None:
+        self.front[:0] = articles
+
+    def copy(self) -> "SnapshotArticles":
+        """Returns a copy that later insertions don't change, like list.copy."""
+        return SnapshotArticles(self.file, list(self.front))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="Convert a saved newsapi response to a news snapshot."
+    )
+    arg_parser.add_argument("response", help="Saved response (.json or .json.gz)")
+    arg_parser.add_argument(
+        "snapshot", nargs="?", help="Default: the response's path with .snap"
+    )
+    args = arg_parser.parse_args()
+    response = helper_extras.read_json_file(args.response)
+    articles = (type(response) is dict and response.get("articles")) or []
+    filename = args.snapshot or (
+        args.response.removesuffix(".gz").removesuffix(".json") + ".snap"
+    )
+    SnapshotFile.write(filename, articles)
+    print(f"Wrote {len(articles)} articles to {filename}")
+
+
+if __name__ == "__main__":
+    main()
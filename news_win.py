@@ -1,7 +1,15 @@
 import curses
+import latency_stats
+import screen_renderer
 
 
 class NewsWin:
+    """Base of the headlines and article windows, which sit side by side.
+
+    The layout is kept in class attributes shared by both windows, from the
+    defaults below until set_size fits it to the terminal.
+    """
+
     HEIGHT = 28
     WIDTH = 60
     TOP_MARGIN = 3
@@ -18,8 +26,60 @@ class NewsWin:
     HEIGHT_TXT = END_Y_TXT - START_Y_TXT + 1
     START_X_WIN_NAME = START_X_TXT
     START_Y_WIN_NAME = START_Y_TXT - 2
+    MIN_HEIGHT = 10
+    MIN_WIDTH = 30
+    STATUS_ROWS = 1  # Rows below the windows for NewsReader's status line
+    SPARE_COLS = 1  # Like the status line, the windows keep off the last column
+    renderer: screen_renderer.ScreenRenderer | None = None  # Set by NewsReader
+    latency = latency_stats.LatencyStats()  # Shared, replaced by NewsReader's
+
+    @classmethod
+    def put_str(
+        cls, win: curses.window, y: int, x: int, text: str, attr: int = 0
+    ) -> None:
+        """Draws text in win through the renderer, if there is one."""
+        if cls.renderer:
+            cls.renderer.put_str(win, y, x, text, attr)
+        else:
+            win.addstr(y, x, text, attr)
+
+    @classmethod
+    def get_min_size(cls) -> tuple[int, int]:
+        """Returns the fewest terminal lines and columns set_size accepts."""
+        return (
+            cls.MIN_HEIGHT + cls.STATUS_ROWS,
+            2 * cls.MIN_WIDTH + cls.RIGHT_MARGIN + 1 + cls.SPARE_COLS,
+        )
+
+    @classmethod
+    def set_size(cls, lines: int, cols: int) -> bool:
+        """Sizes the windows to fill a terminal of lines and columns,
+        leaving the status line below them.
+
+        The size is set on NewsWin, even if called on a subclass,
+        so that both windows share it.
+
+        Returns:
+            False, leaving the size as it was, if the terminal is smaller
+            than get_min_size.
+        """
+        min_lines, min_cols = cls.get_min_size()
+        if lines < min_lines or cols < min_cols:
+            return False
+        # The article window starts RIGHT_MARGIN + 1 columns after the headlines'.
+        NewsWin.HEIGHT = lines - cls.STATUS_ROWS
+        NewsWin.WIDTH = (cols - cls.SPARE_COLS - cls.RIGHT_MARGIN - 1) // 2
+        NewsWin.END_X_TXT = NewsWin.WIDTH - (cls.RIGHT_MARGIN + 1)
+        NewsWin.END_Y_TXT = NewsWin.HEIGHT - (cls.BOTTOM_MARGIN + 1)
+        NewsWin.WIDTH_TXT = NewsWin.END_X_TXT - cls.START_X_TXT + 1
+        NewsWin.HEIGHT_TXT = NewsWin.END_Y_TXT - cls.START_Y_TXT + 1
+        return True
 
     def __init__(self, startx):
+        self.make_win(startx)
+
+    def make_win(self, startx: int) -> None:
+        """Makes the window, at the current size, e.g. again after set_size."""
         self.win = curses.newwin(
             self.HEIGHT,
             self.WIDTH,
@@ -39,4 +99,8 @@ class NewsWin:
         )
 
     def refresh_win(self):
-        self.win.refresh()
+        # With a renderer, the terminal is updated when it commits the frame.
+        if self.renderer:
+            self.renderer.stage(self.win)
+        else:
+            self.win.refresh()
@@ -0,0 +1,133 @@
+import curses
+
+
+class ScreenRenderer:
+    """Batches the drawing of all the windows into one terminal update per frame.
+
+    Text is drawn through put_str, which skips text that's already on screen
+    at that position, and windows are staged with noutrefresh, so commit
+    updates the terminal once (with doupdate) however many windows changed.
+
+    The bytes written to the terminal per frame are estimated from the cells
+    that differ between the start and end of the frame, plus a cursor move
+    per changed span and an attribute change per span drawn with attributes.
+    Text drawn into a pad only counts once it's staged into view, as the
+    screen rows its viewport shows.
+
+    Attributes:
+        drawn: Dict of (window id, y, x) to the (text, attr) last drawn there.
+            Screen rows shown through a pad's viewport use the window id 0.
+        frame_old: Dict of the same keys to what was there at the start of the
+            frame, for the positions drawn to during the frame.
+        is_pending: Boolean of whether a window was staged since the last commit.
+        stats: Dict of the frame count, skipped draws and estimated bytes
+            (total, last frame and largest frame).
+        MOVE_BYTES: Estimated bytes of a cursor move.
+        ATTR_BYTES: Estimated bytes of an attribute change and reset.
+    """
+
+    MOVE_BYTES = 8
+    ATTR_BYTES = 10
+
+    @classmethod
+    def _get_changed_bytes(
+        cls, old: tuple[str, int] | None, new: tuple[str, int]
+    ) -> int:
+        """Returns the estimated bytes to change the cells from old to new."""
+        old_txt, old_attr = old or ("", 0)
+        new_txt, new_attr = new
+        changed = [
+            i
+            for i, ch in enumerate(new_txt)
+            if old_attr != new_attr or old_txt[i : i + 1] != ch
+        ]
+        if not changed:
+            return 0
+        return (
+            len(new_txt[changed[0] : changed[-1] + 1].encode("utf-8"))
+            + cls.MOVE_BYTES
+            + ((new_attr and cls.ATTR_BYTES) or 0)
+        )
+
+    def __init__(self) -> None:
+        self.drawn: dict[tuple[int, int, int], tuple[str, int]] = {}
+        self.frame_old: dict[tuple[int, int, int], tuple[str, int] | None] = {}
+        self.is_pending = False
+        self.pads: set[int] = set()  # Ids of the staged pads
+        self.stats = {
+            "frames": 0,
+            "skipped_draws": 0,
+            "bytes": 0,
+            "last_frame_bytes": 0,
+            "max_frame_bytes": 0,
+        }
+
+    def put_str(
+        self, win: curses.window, y: int, x: int, text: str, attr: int = 0
+    ) -> None:
+        """Draws text at y, x in win unless it's already there."""
+        key = (id(win), y, x)
+        new = (text, attr)
+        old = self.drawn.get(key)
+        if old == new:
+            self.stats["skipped_draws"] += 1
+            return
+        win.addstr(y, x, text, attr)
+        self.frame_old.setdefault(key, old)
+        self.drawn[key] = new
+
+    def forget(self, win: curses.window) -> None:
+        """Forgets what was drawn in win, e.g. after it's been erased."""
+        self.drawn = {key: v for key, v in self.drawn.items() if key[0] != id(win)}
+        self.frame_old = {
+            key: v for key, v in self.frame_old.items() if key[0] != id(win)
+        }
+
+    def forget_all(self) -> None:
+        """Forgets everything drawn, e.g. after the screen's been cleared."""
+        self.drawn = {}
+        self.frame_old = {}
+        self.pads = set()
+
+    def stage(self, win: curses.window, *view: int) -> None:
+        """Marks win to be sent to the terminal on the next commit. For a pad,
+        view is the (pminrow, pmincol, sminrow, smincol, smaxrow, smaxcol)
+        of its viewport, as for pad.noutrefresh."""
+        win.noutrefresh(*view)
+        self.is_pending = True
+        if not view:
+            return
+        self.pads.add(id(win))
+        pminrow, pmincol, sminrow, smincol, smaxrow, smaxcol = view
+        for row in range(sminrow, smaxrow + 1):
+            text, attr = self.drawn.get(
+                (id(win), pminrow + row - sminrow, pmincol), ("", 0)
+            )
+            text = text[: smaxcol - smincol + 1].ljust(smaxcol - smincol + 1)
+            key = (0, row, smincol)
+            if self.drawn.get(key) != (text, attr):
+                self.frame_old.setdefault(key, self.drawn.get(key))
+                self.drawn[key] = (text, attr)
+
+    def commit(self) -> None:
+        """Sends all the staged windows to the terminal in one update."""
+        if not self.is_pending:
+            return
+        curses.doupdate()
+        frame_bytes = sum(
+            self._get_changed_bytes(old, self.drawn[key])
+            for key, old in self.frame_old.items()
+            if key[0] not in self.pads
+        )
+        self.frame_old = {}
+        self.is_pending = False
+        self.stats["frames"] += 1
+        self.stats["bytes"] += frame_bytes
+        self.stats["last_frame_bytes"] = frame_bytes
+        self.stats["max_frame_bytes"] = max(self.stats["max_frame_bytes"], frame_bytes)
+
+    def get_stats(self) -> dict:
+        return dict(
+            self.stats,
+            bytes_per_frame=self.stats["bytes"] / (self.stats["frames"] or 1),
+        )
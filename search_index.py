@@ -0,0 +1,95 @@
+import collections
+import heapq
+import math
+import re
+
+
+class SearchIndex:
+    """Inverted index over the headlines' fields and their articles' text,
+    keyed by url so it doesn't change when headlines are inserted.
+
+    Headlines and article text can be added at any time. Searches return
+    the urls that have every word of the query, ranked by the weighted term
+    frequency of each word (by field, dampened for article text) times how
+    rare the word is.
+
+    Attributes:
+        postings: Dict of word to a dict of url to its weighted term frequency.
+        headline_urls: Set of the urls of the headlines added.
+        body_urls: Set of the urls whose article text has been added.
+        FIELD_WEIGHTS: Dict of headline field to how much a word in it counts.
+        BODY_WEIGHT: How much a word in the article text counts.
+    """
+
+    FIELD_WEIGHTS = {"title": 3.0, "description": 1.5, "source": 1.0, "author": 1.0}
+    BODY_WEIGHT = 0.5
+    WORD = re.compile(r"\w\w+")  # Single characters aren't indexed
+
+    @classmethod
+    def get_words(cls, text: str | None) -> list[str]:
+        return cls.WORD.findall((text or "").lower())
+
+    def __init__(self) -> None:
+        self.postings: dict[str, dict[str, float]] = {}
+        self.headline_urls: set[str] = set()
+        self.body_urls: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self.headline_urls)
+
+    def _add_weights(self, url: str, weights: dict[str, float]) -> None:
+        for word, weight in weights.items():
+            posting = self.postings.get(word)
+            if posting is None:
+                posting = self.postings[word] = {}
+            posting[url] = posting.get(url, 0.0) + weight
+
+    def add_headline(self, article: dict) -> None:
+        """Indexes the fields of a newsapi article, unless its url is indexed."""
+        url = article.get("url") or ""
+        if not url or url in self.headline_urls:
+            return
+        self.headline_urls.add(url)
+        source = article.get("source")
+        weights: dict[str, float] = {}
+        for field, weight in self.FIELD_WEIGHTS.items():
+            text = (field == "source" and source and source.get("name")) or (
+                field != "source" and article.get(field)
+            )
+            for word in self.get_words(text or ""):
+                weights[word] = weights.get(word, 0.0) + weight
+        self._add_weights(url, weights)
+
+    def add_body(self, url: str, text: str) -> None:
+        """Indexes the text of url's article, unless it's indexed."""
+        if url and url not in self.body_urls:
+            self.body_urls.add(url)
+            counts = collections.Counter(self.get_words(text))
+            self._add_weights(
+                url,
+                {
+                    word: self.BODY_WEIGHT * (1 + math.log(count))
+                    for word, count in counts.items()
+                },
+            )
+
+    def search(self, query: str, limit: int = 100) -> list[str]:
+        """Returns up to limit urls that have every word of query, best first."""
+        postings = [
+            self.postings.get(word) or {} for word in set(self.get_words(query))
+        ]
+        if not postings:
+            return []
+        postings.sort(key=len)  # Intersect starting from the rarest word
+        doc_count = len(self.headline_urls) or 1
+        idfs = [math.log(1 + doc_count / (len(p) or 1)) for p in postings]
+        urls = postings[0].keys()
+        if len(postings) > 1:
+            urls = set(urls).intersection(*postings[1:])
+        if len(postings) == 1:
+            return heapq.nlargest(limit, urls, key=postings[0].__getitem__)
+        return heapq.nlargest(
+            limit,
+            urls,
+            key=lambda url: sum(p[url] * idf for p, idf in zip(postings, idfs)),
+        )
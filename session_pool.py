@@ -0,0 +1,131 @@
+from __future__ import annotations
+import functools
+import helper_extras
+import threading
+import typing
+import urllib.parse
+
+if typing.TYPE_CHECKING:
+    import requests
+
+
+@functools.cache
+def get_pooled_session_class() -> type:
+    """Returns the PooledSession class, defining it on first use,
+    so importing this module doesn't import requests (which is slow)."""
+    requests = helper_extras.import_module("requests")
+
+    class PooledSession(requests.Session):
+        """A requests.Session that applies the pool's connect/read timeouts
+        to every request made through it, including requests made by newsapi,
+        and sends them to the pool's base url instead if it has one."""
+
+        def __init__(self, timeout: tuple[float, float], base_url: str = "") -> None:
+            super().__init__()
+            self.timeout = timeout
+            self.base_url = base_url
+
+        def request(self, method, url, *args, **kwargs):
+            kwargs["timeout"] = self.timeout
+            if self.base_url:
+                url = (
+                    self.base_url
+                    + urllib.parse.urlsplit(url)._replace(scheme="", netloc="").geturl()
+                )
+            return super().request(method, url, *args, **kwargs)
+
+    return PooledSession
+
+
+class SessionPool:
+    """Shared keep-alive HTTP sessions, one per host.
+
+    Requests to the same host reuse the connections in that host's session,
+    so repeated fetches from one publisher skip the DNS lookup, TCP connect
+    and TLS handshake.
+
+    Attributes:
+        pool_size: Max number of connections kept alive per host.
+        timeout: Tuple of the connect and read timeouts in seconds.
+        sessions: Dict of host to its PooledSession.
+        base_url: String of the scheme and host (e.g. "http://127.0.0.1:8080")
+            every request is sent to instead of its own, keeping its path and
+            query, or an empty string. Used to point the app at a local
+            stand-in server such as fixture_server.FixtureServer.
+        POOL_SIZE: Default pool size.
+        CONNECT_TIMEOUT: Default connect timeout.
+        READ_TIMEOUT: Default read timeout.
+    """
+
+    POOL_SIZE = 4
+    CONNECT_TIMEOUT = 5.0
+    READ_TIMEOUT = 15.0
+
+    @staticmethod
+    def _get_host(url: str) -> str:
+        return urllib.parse.urlsplit(url).netloc.lower()
+
+    def __init__(
+        self,
+        pool_size: int = POOL_SIZE,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+        base_url: str = "",
+    ) -> None:
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.base_url = base_url.rstrip("/")
+        self.sessions: dict[str, requests.Session] = {}
+        self.lock = threading.Lock()
+
+    def get_session(self, url: str) -> requests.Session:
+        """Returns the (PooledSession) session for url's host,
+        creating it on first use."""
+        host = self._get_host(url)
+        with self.lock:
+            session = self.sessions.get(host)
+            if session is None:
+                adapters = helper_extras.import_module("requests.adapters")
+                session = get_pooled_session_class()(self.timeout, self.base_url)
+                adapter = adapters.HTTPAdapter(
+                    pool_connections=1, pool_maxsize=self.pool_size
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self.sessions[host] = session
+            return session
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.get_session(url).get(url, **kwargs)
+
+    def get_stats(self) -> dict:
+        """Returns a dict of host to its request, new connection and reused
+        connection counts, plus the totals under the "all" key.
+        """
+        stats = {}
+        total = {"requests": 0, "new_connections": 0, "reused_connections": 0}
+        with self.lock:
+            sessions = list(self.sessions.items())
+        for host, session in sessions:
+            host_stats = {"requests": 0, "new_connections": 0}
+            adapters = {id(a): a for a in session.adapters.values()}.values()
+            for adapter in adapters:
+                for key in adapter.poolmanager.pools.keys():
+                    pool = adapter.poolmanager.pools.get(key)
+                    if pool:
+                        host_stats["requests"] += pool.num_requests
+                        host_stats["new_connections"] += pool.num_connections
+            host_stats["reused_connections"] = max(
+                host_stats["requests"] - host_stats["new_connections"], 0
+            )
+            stats[host] = host_stats
+            for k in total:
+                total[k] += host_stats[k]
+        stats["all"] = total
+        return stats
+
+    def close(self) -> None:
+        with self.lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions = {}
@@ -0,0 +1,103 @@
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+
+
+class SessionProfiler:
+    """Profiles the app with cProfile between start and stop.
+
+    Before Python 3.12, cProfile only profiles the thread it's enabled in,
+    so the curses thread gets a profile of its own, and functions run through
+    wrap (the fetch engine's jobs) each get one for the call, in the thread
+    they run in, while the profiler is running. stop merges them into one
+    pstats.Stats. Calls still running when it stops are left out. From 3.12,
+    cProfile profiles every thread (and only one can be enabled at a time),
+    so the curses thread's profile has it all and wrap leaves fn as it is.
+
+    Attributes:
+        profiles: List of the cProfile.Profile of the curses thread and of
+            each wrapped call that has finished.
+        session: Number of times the profiler has been started, so calls
+            finishing after it's stopped (or restarted) are left out.
+        is_running: Boolean of whether the profiler is running.
+        started_at: time.perf_counter when it was last started.
+        TXT_LIMIT: Number of functions listed in get_txt's tables.
+    """
+
+    TXT_LIMIT = 40
+    IS_PER_THREAD = sys.version_info < (3, 12)  # See the class docstring
+
+    @classmethod
+    def get_txt(cls, stats: pstats.Stats, secs: float = 0.0) -> str:
+        """Returns the functions with the most cumulative and own time,
+        and the callers of the ones with the most own time."""
+        stream = io.StringIO()
+        stream.write(f"Profiled {secs:.1f} s\n")
+        stats.stream = stream
+        stats.sort_stats("cumulative").print_stats(cls.TXT_LIMIT)
+        stats.sort_stats("tottime").print_stats(cls.TXT_LIMIT)
+        stats.print_callers(cls.TXT_LIMIT)
+        return stream.getvalue()
+
+    def __init__(self) -> None:
+        self.profiles: list[cProfile.Profile] = []
+        self.session = 0
+        self.is_running = False
+        self.started_at = 0.0
+        self.lock = threading.Lock()
+
+    def start(self) -> None:
+        """Starts profiling the calling thread and the functions run through wrap."""
+        if self.is_running:
+            return
+        profile = cProfile.Profile()
+        with self.lock:
+            self.profiles = [profile]
+            self.session += 1
+            self.is_running = True
+        self.started_at = time.perf_counter()
+        profile.enable()
+
+    def stop(self) -> tuple[pstats.Stats, float] | None:
+        """Stops profiling, started by the calling thread.
+
+        Returns:
+            The merged stats of every thread profiled and the seconds
+            profiled, or None if the profiler wasn't running or profiled
+            no calls.
+        """
+        if not self.is_running:
+            return None
+        self.profiles[0].disable()
+        with self.lock:
+            self.is_running = False
+            profiles, self.profiles = self.profiles, []
+        secs = time.perf_counter() - self.started_at
+        for profile in profiles:
+            profile.create_stats()
+        profiles = [profile for profile in profiles if profile.stats]
+        return (profiles or None) and (pstats.Stats(*profiles), secs)
+
+    def wrap(self, fn):
+        """Returns fn, profiled in the thread it's called in if the profiler
+        is running when it's called."""
+
+        if not self.IS_PER_THREAD:
+            return fn
+
+        def run(*args):
+            if not self.is_running:
+                return fn(*args)
+            session = self.session
+            profile = cProfile.Profile()
+            try:
+                return profile.runcall(fn, *args)
+            finally:
+                with self.lock:
+                    if self.is_running and self.session == session:
+                        self.profiles.append(profile)
+
+        return run
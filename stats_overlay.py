@@ -0,0 +1,83 @@
+import curses
+import latency_stats
+import news_win
+
+
+class StatsOverlay:
+    """A box drawn over the article window with the p50/p95/p99 of each
+    stage in a LatencyStats, redrawn every REDRAW_SECS while it's shown.
+
+    Attributes:
+        stats: The LatencyStats shown.
+        win: The overlay's curses window, made when it's first shown, or None.
+        is_shown: Boolean of whether the overlay is showing.
+        REDRAW_SECS: Least seconds between redraws of the numbers.
+    """
+
+    REDRAW_SECS = 1.0
+    MARGIN = 2  # Columns and rows between the article window's box and the overlay
+
+    def __init__(self, stats: latency_stats.LatencyStats) -> None:
+        self.stats = stats
+        self.win: curses.window | None = None
+        self.is_shown = False
+        self.drawn_at = 0.0  # time.monotonic of the last redraw
+
+    def get_rect(self, start_x: int) -> tuple[int, int, int, int]:
+        """Returns the height, width, y and x of the overlay over the window
+        starting at start_x, cut to fit the screen."""
+        y = news_win.NewsWin.START_Y + self.MARGIN
+        x = start_x + self.MARGIN
+        height = min(news_win.NewsWin.HEIGHT - 2 * self.MARGIN, curses.LINES - y)
+        width = min(news_win.NewsWin.WIDTH - 2 * self.MARGIN, curses.COLS - x)
+        return height, width, y, x
+
+    def show(self, start_x: int) -> None:
+        height, width, y, x = self.get_rect(start_x)
+        if height < 3 or width < 3:
+            return  # The screen is too small to show it
+        self.win = curses.newwin(height, width, y, x)
+        self.is_shown = True
+        self.drawn_at = 0.0
+
+    def hide(self) -> None:
+        """Hides the overlay. The windows under it need touching and staging
+        again to show what was behind it."""
+        if news_win.NewsWin.renderer:
+            news_win.NewsWin.renderer.forget(self.win)
+        self.is_shown = False
+        self.win = None
+
+    def poll(self, now: float) -> None:
+        """Redraws the numbers if the overlay is shown and they're due."""
+        if self.is_shown and now - self.drawn_at >= self.REDRAW_SECS:
+            self.drawn_at = now
+            self.print_stats()
+
+    def keep_on_top(self) -> None:
+        """Stages the overlay again, if it's shown, so the windows staged
+        since it was don't cover it."""
+        if self.is_shown and news_win.NewsWin.renderer:
+            self.win.touchwin()
+            news_win.NewsWin.renderer.stage(self.win)
+
+    def print_stats(self) -> None:
+        height, width = self.win.getmaxyx()
+        lines = [f"{'Latency (ms)':18}{'p50':>8}{'p95':>8}{'p99':>8}{'n':>7}", ""]
+        for stage, report in self.stats.get_report().items():
+            lines.append(
+                f"{stage[:18]:18}{report['p50_ms']:8.1f}{report['p95_ms']:8.1f}"
+                f"{report['p99_ms']:8.1f}{report['count']:7}"
+            )
+        if len(lines) == 2:
+            lines.append("No timings yet.")
+        self.win.box("|", "-")
+        for row in range(1, height - 1):
+            line = (row - 1 < len(lines) and lines[row - 1]) or ""
+            news_win.NewsWin.put_str(
+                self.win, row, 1, line[: width - 2].ljust(width - 2)
+            )
+        if news_win.NewsWin.renderer:
+            news_win.NewsWin.renderer.stage(self.win)
+        else:
+            self.win.refresh()